@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Ingest a lattice of NASA POWER monthly files into a gridded cube.
+
+``global_tem_by_year.csv`` and ``global_precip_by_year.csv`` used to come
+from a single POWER point at 0N 0E. This script:
+- reads every POWER monthly CSV in ``data/weather_temperature_percipitation/``
+  in parallel. Point files carry their location in the header; regional
+  files carry LAT / LON columns.
+- stores each parameter as a memory-mapped ``(year, month, lat, lon)``
+  float32 cube in ``data/preprocessed/power_grid/<PARAMETER>.npy``. The month
+  axis holds JAN..DEC plus the file's ANN value.
+- computes cos(latitude) area-weighted means over the cells that have data,
+  globally and for a few latitude bands. A band is only written to
+  ``regional_by_year.csv`` when the lattice covers it (enough cells, spread
+  over enough of its latitudes).
+
+The global means are written with the existing schema
+(``PARAMETER,YEAR,JAN..DEC,ANN``), so ``bar.js`` / ``vis4.js`` need no
+change. With only the original 0N 0E file present, the output is that
+point's values and the regional CSV has only its header.
+
+    python3 scripts/build_power_grid.py                      # ingest + write CSVs
+    python3 scripts/build_power_grid.py --urls 10            # POWER API URLs for a 10-degree lattice
+    python3 scripts/build_power_grid.py --fixtures DIR 5     # synthetic 5-degree lattice for offline runs
+    python3 scripts/build_power_grid.py --input DIR
+
+Run from repository root.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INPUT_DIR = REPO_ROOT / "data" / "weather_temperature_percipitation"
+PREPROCESSED_DIR = REPO_ROOT / "data" / "preprocessed"
+GRID_DIR = PREPROCESSED_DIR / "power_grid"
+REGIONAL_CSV = GRID_DIR / "regional_by_year.csv"
+WORKERS = os.cpu_count() or 1
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+PERIODS = MONTHS + ["ANN"]
+MISSING = -999.0
+GLOBAL_OUTPUTS = {
+    "T2M": PREPROCESSED_DIR / "global_tem_by_year.csv",
+    "PRECTOTCORR": PREPROCESSED_DIR / "global_precip_by_year.csv",
+}
+# name: (south, north) latitude bounds, inclusive of cell centres
+REGIONS = {
+    "global": (-90.0, 90.0),
+    "northern_extratropics": (23.5, 90.0),
+    "tropics": (-23.5, 23.5),
+    "southern_extratropics": (-90.0, -23.5),
+}
+# A region's mean is only written when at least this many cells have data and
+# their latitudes span this fraction of the band
+MIN_REGION_CELLS = 20
+MIN_REGION_LAT_SPAN = 0.4
+API_URL = (
+    "https://power.larc.nasa.gov/api/temporal/monthly/point?parameters=T2M,PRECTOTCORR"
+    "&community=SB&longitude={lon}&latitude={lat}&start=1981&end=2024&format=CSV"
+)
+
+LOCATION = re.compile(r"Latitude\s+(-?[\d.]+)\s+Longitude\s+(-?[\d.]+)")
+
+
+def parse_power_file(path: Path) -> list[tuple[str, float, float, int, list[float]]]:
+    """Records ``(parameter, lat, lon, year, [JAN..DEC, ANN])`` from one POWER CSV."""
+    with path.open(encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    location = None
+    start = 0
+    if lines and lines[0].startswith("-BEGIN HEADER-"):
+        end = lines.index("-END HEADER-")
+        for line in lines[1:end]:
+            match = LOCATION.search(line)
+            if match:
+                location = (float(match.group(1)), float(match.group(2)))
+        start = end + 1
+
+    records = []
+    for row in csv.DictReader(lines[start:]):
+        if "LAT" in row and "LON" in row:
+            lat, lon = float(row["LAT"]), float(row["LON"])
+        elif location is not None:
+            lat, lon = location
+        else:
+            raise ValueError(f"{path.name}: no location in header and no LAT/LON columns")
+        values = [float(row[period]) for period in PERIODS]
+        records.append((row["PARAMETER"], lat, lon, int(row["YEAR"]), values))
+    return records
+
+
+def list_power_files(input_dir: Path) -> list[Path]:
+    return sorted(input_dir.glob("POWER_*.csv"))
+
+
+def ingest(paths: list[Path], grid_dir: Path = GRID_DIR, workers: int = WORKERS) -> dict[str, np.memmap]:
+    """Parse ``paths`` in parallel and fill one memory-mapped cube per parameter."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(parse_power_file, paths, chunksize=max(1, len(paths) // (4 * workers))))
+    records = [record for file_records in parsed for record in file_records]
+    if not records:
+        raise SystemExit("no POWER records found")
+
+    params = sorted({r[0] for r in records})
+    years = sorted({r[3] for r in records})
+    lats = sorted({r[1] for r in records})
+    lons = sorted({r[2] for r in records})
+    param_idx = np.array([params.index(r[0]) for r in records])
+    year_idx = np.searchsorted(years, [r[3] for r in records])
+    lat_idx = np.searchsorted(lats, [r[1] for r in records])
+    lon_idx = np.searchsorted(lons, [r[2] for r in records])
+    values = np.array([r[4] for r in records], dtype=np.float32)
+    values[values == MISSING] = np.nan
+
+    grid_dir.mkdir(parents=True, exist_ok=True)
+    shape = (len(years), len(PERIODS), len(lats), len(lons))
+    cubes = {}
+    for p, param in enumerate(params):
+        cube = np.lib.format.open_memmap(grid_dir / f"{param}.npy", mode="w+", dtype=np.float32, shape=shape)
+        cube[:] = np.nan
+        sel = param_idx == p
+        # (record, period) -> cube[year, period, lat, lon]
+        cube[year_idx[sel, None], np.arange(len(PERIODS)), lat_idx[sel, None], lon_idx[sel, None]] = values[sel]
+        cube.flush()
+        cubes[param] = cube
+    meta = {"parameters": params, "years": years, "periods": PERIODS, "lats": lats, "lons": lons}
+    (grid_dir / "grid.json").write_text(json.dumps(meta) + "\n", encoding="utf-8")
+    print(f"[ok] {len(paths)} files -> {len(lats)} x {len(lons)} lattice, {len(years)} years, "
+          f"{len(params)} parameters in {grid_dir}")
+    return cubes
+
+
+def load_grid(grid_dir: Path = GRID_DIR) -> tuple[dict, dict[str, np.memmap]]:
+    meta = json.loads((grid_dir / "grid.json").read_text(encoding="utf-8"))
+    cubes = {param: np.load(grid_dir / f"{param}.npy", mmap_mode="r") for param in meta["parameters"]}
+    return meta, cubes
+
+
+def area_weighted_mean(cube: np.ndarray, lats: list[float], south: float = -90.0, north: float = 90.0) -> np.ndarray:
+    """cos(lat)-weighted mean over (lat, lon) of the cells with data, per (year, period)."""
+    lats = np.asarray(lats, dtype=np.float64)
+    band = (lats >= south) & (lats <= north)
+    if not band.any():
+        return np.full(cube.shape[:2], np.nan)
+    data = np.asarray(cube[:, :, band, :], dtype=np.float64)
+    weights = np.cos(np.radians(lats[band]))[None, None, :, None] * np.ones(data.shape[-1])
+    present = ~np.isnan(data)
+    total = np.where(present, weights, 0.0).sum(axis=(2, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(present, data * weights, 0.0).sum(axis=(2, 3)) / np.where(total > 0, total, np.nan)
+
+
+def covers(cube: np.ndarray, lats: list[float], south: float, north: float) -> bool:
+    """Whether the cells with data inside ``south..north`` are enough to stand for the band."""
+    lats = np.asarray(lats, dtype=np.float64)
+    band = (lats >= south) & (lats <= north)
+    if not band.any():
+        return False
+    present = ~np.isnan(np.asarray(cube[:, :, band, :], dtype=np.float64)).all(axis=(0, 1))
+    covered = lats[band][present.any(axis=1)]
+    if present.sum() < MIN_REGION_CELLS:
+        return False
+    return bool(covered.max() - covered.min() >= MIN_REGION_LAT_SPAN * (north - south))
+
+
+def _rows(param: str, years: list[int], means: np.ndarray) -> list[dict[str, str]]:
+    rows = []
+    for y, year in enumerate(years):
+        if np.isnan(means[y]).all():
+            continue
+        row = {"PARAMETER": param, "YEAR": str(year)}
+        row.update({
+            period: "" if np.isnan(value) else str(round(float(value), 2))
+            for period, value in zip(PERIODS, means[y])
+        })
+        rows.append(row)
+    return rows
+
+
+def write_means(meta: dict, cubes: dict[str, np.ndarray]) -> None:
+    fields = ["PARAMETER", "YEAR", *PERIODS]
+    for param, path in GLOBAL_OUTPUTS.items():
+        if param not in cubes:
+            continue
+        means = area_weighted_mean(cubes[param], meta["lats"], *REGIONS["global"])
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(_rows(param, meta["years"], means))
+        print(f"[ok] wrote {path}")
+
+    with REGIONAL_CSV.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["REGION", *fields], lineterminator="\n")
+        writer.writeheader()
+        for region, (south, north) in REGIONS.items():
+            for param in sorted(cubes):
+                if not covers(cubes[param], meta["lats"], south, north):
+                    print(f"[skip] {region} {param}: lattice too sparse for a regional mean")
+                    continue
+                means = area_weighted_mean(cubes[param], meta["lats"], south, north)
+                writer.writerows({"REGION": region, **row} for row in _rows(param, meta["years"], means))
+    print(f"[ok] wrote {REGIONAL_CSV}")
+
+
+def lattice(step: float) -> list[tuple[float, float]]:
+    lats = np.arange(-90 + step / 2, 90, step)
+    lons = np.arange(-180 + step / 2, 180, step)
+    return [(round(float(lat), 3), round(float(lon), 3)) for lat in lats for lon in lons]
+
+
+def _coordinate(value: float, positive: str, negative: str) -> str:
+    """POWER file-name spelling of a coordinate, e.g. 2.5 -> ``002d50N``."""
+    return f"{abs(value):06.2f}".replace(".", "d") + (positive if value >= 0 else negative)
+
+
+def write_fixtures(out_dir: Path, step: float) -> None:
+    """Synthetic POWER point files on a lattice, shaped like the real 0N 0E file."""
+    rng = np.random.default_rng(401)
+    years = list(range(1981, 2025))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for lat, lon in lattice(step):
+        season = np.cos(np.radians(30 * np.arange(12) - (0 if lat >= 0 else 180) - 195))
+        t2m = 27 - 0.4 * abs(lat) + 0.15 * abs(lat) * season + rng.normal(0, 0.5, (len(years), 12))
+        t2m += 0.02 * (np.array(years)[:, None] - 1981)
+        precip = np.clip(6 * np.cos(np.radians(lat)) ** 2 + rng.normal(0, 1, (len(years), 12)), 0, None)
+        name = f"POWER_Point_Monthly_19810101_20241231_{_coordinate(lat, 'N', 'S')}_{_coordinate(lon, 'E', 'W')}_LST.csv"
+        with (out_dir / name).open("w", encoding="utf-8") as f:
+            f.write("-BEGIN HEADER-\nNASA/POWER synthetic fixture\n")
+            f.write(f"Location: Latitude  {lat}   Longitude {lon} \n-END HEADER-\n")
+            f.write(",".join(["PARAMETER", "YEAR", *PERIODS]) + "\n")
+            for param, grid in (("PRECTOTCORR", precip), ("T2M", t2m)):
+                for year, monthly in zip(years, grid):
+                    values = [f"{v:.2f}" for v in monthly] + [f"{monthly.mean():.2f}"]
+                    f.write(",".join([param, str(year), *values]) + "\n")
+    print(f"[ok] wrote {len(lattice(step))} fixture files to {out_dir}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grid POWER monthly files and write area-weighted means.")
+    parser.add_argument("--input", type=Path, default=INPUT_DIR, help="directory of POWER_*.csv files")
+    parser.add_argument("--urls", type=float, metavar="STEP", help="print POWER API URLs for a STEP-degree lattice")
+    parser.add_argument("--fixtures", nargs=2, metavar=("DIR", "STEP"), help="write synthetic lattice files")
+    parser.add_argument("--jobs", type=int, default=WORKERS, help="parser processes")
+    args = parser.parse_args()
+
+    if args.urls:
+        for lat, lon in lattice(args.urls):
+            print(API_URL.format(lat=lat, lon=lon))
+        return
+    if args.fixtures:
+        write_fixtures(Path(args.fixtures[0]), float(args.fixtures[1]))
+        return
+
+    paths = list_power_files(args.input)
+    if not paths:
+        raise SystemExit(f"no POWER_*.csv files in {args.input}")
+    ingest(paths, workers=max(args.jobs, 1))
+    meta, cubes = load_grid()
+    write_means(meta, cubes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Write content-hashed, precompressed copies of the website's data files.
+
+For every data file the pages fetch, writes
+``data/dist/<same path>/<name>.<hash>.<ext>`` plus ``.gz`` and (when the
+optional ``brotli`` package is installed) ``.br`` siblings, and a
+``data/dist/manifest.json`` mapping the original repository-relative path
+to the hashed one. ``website/js/assets.js`` resolves fetches through the
+manifest and falls back to the original path when it is absent, so the
+site keeps working without this build step.
+
+Hashed names never change content, so they can be served with an
+immutable cache policy (see ``scripts/serve_static.py``).
+Run from repository root.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional, gzip variants are always written
+    brotli = None
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / "data"
+DIST_DIR = DATA_DIR / "dist"
+MANIFEST_PATH = DIST_DIR / "manifest.json"
+HASH_LENGTH = 10
+
+# Files fetched by website/js/*.js, relative to data/
+ASSET_GLOBS = [
+    "preprocessed/*.csv",
+    "preprocessed/vis2/*.csv",
+    "preprocessed/vis3/country_to_region.csv",
+    "co2/owid-co2-data.csv",
+    "basemap/world-110m.*.json",
+]
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(path: Path, digest: str) -> str:
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+def collect_assets() -> list[Path]:
+    paths: set[Path] = set()
+    for pattern in ASSET_GLOBS:
+        paths.update(p for p in DATA_DIR.glob(pattern) if p.is_file())
+    return sorted(paths)
+
+
+def write_asset(source: Path) -> tuple[str, dict]:
+    data = source.read_bytes()
+    digest = content_hash(data)
+    relative = source.relative_to(DATA_DIR)
+    target = DIST_DIR / relative.parent / hashed_name(source, digest)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    entry = {"path": str(target.relative_to(REPO_ROOT).as_posix()), "hash": digest, "bytes": len(data)}
+    if not target.exists():
+        target.write_bytes(data)
+        # mtime=0 keeps the .gz byte-identical across rebuilds
+        target.with_name(target.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            target.with_name(target.name + ".br").write_bytes(brotli.compress(data, quality=11))
+    entry["gzip_bytes"] = target.with_name(target.name + ".gz").stat().st_size
+    br_path = target.with_name(target.name + ".br")
+    if br_path.exists():
+        entry["br_bytes"] = br_path.stat().st_size
+    return str(source.relative_to(REPO_ROOT).as_posix()), entry
+
+
+def prune(keep: set[Path]) -> int:
+    """Delete hashed files (and their compressed siblings) no longer in the manifest."""
+    removed = 0
+    for path in DIST_DIR.rglob("*"):
+        if not path.is_file() or path == MANIFEST_PATH:
+            continue
+        base = path.with_suffix("") if path.suffix in (".gz", ".br") else path
+        if base not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def main() -> None:
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    files: dict[str, dict] = {}
+    for source in collect_assets():
+        key, entry = write_asset(source)
+        files[key] = entry
+        ratio = entry["gzip_bytes"] / entry["bytes"] if entry["bytes"] else 0
+        print(f"[ok] {key} -> {entry['path']} (gzip {ratio:.0%})")
+
+    removed = prune({REPO_ROOT / entry["path"] for entry in files.values()})
+    manifest = {"version": 1, "files": {key: entry["path"] for key, entry in files.items()}}
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    raw = sum(e["bytes"] for e in files.values())
+    gz = sum(e["gzip_bytes"] for e in files.values())
+    print(f"[ok] wrote {MANIFEST_PATH}: {len(files)} assets, {raw / 1e6:.2f} MB raw, {gz / 1e6:.2f} MB gzip"
+          + ("" if brotli is not None else " (install 'brotli' for .br variants)"))
+    if removed:
+        print(f"[ok] pruned {removed} stale file(s)")
+
+
+if __name__ == "__main__":
+    main()
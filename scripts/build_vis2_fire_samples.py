@@ -3,14 +3,48 @@
 
 Reads large yearly NASA VIIRS fire archives and outputs reservoir samples so
 the frontend can animate by year without loading tens of millions of rows.
+Archives may be plain or compressed (.csv.gz, .csv.zst, FIRMS .zip bundle).
+Uncompressed archives are split into newline-aligned byte ranges sampled by
+separate worker processes, then merged into one uniform reservoir.
+Rows are validated a pandas chunk at a time by ``fire_validation.valid_rows``
+and only the rows that pass reach the sampler. The same scan fills t-digest
+sketches of FRP and brightness per year and type (see ``quantile_sketch.py``),
+so tail statistics come from every detection rather than the sample.
+
+With ``--frp-weighted`` the reservoir favours intense fires. Each detection
+is kept with probability rising with ``frp ** exponent`` (A-ExpJ weighted
+reservoir). Every sampled row gets a ``sample_weight``, the number of
+detections it stands for, so the page can re-weight its aggregates.
+
+    python3 scripts/build_vis2_fire_samples.py
+    python3 scripts/build_vis2_fire_samples.py --frp-weighted [--frp-exponent 1.0]
+
 Run from repository root.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
+import heapq
+import math
+import os
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable
+
+from fire_archive_io import (
+    ReadStats,
+    archive_format,
+    find_year_archive,
+    iter_range_lines,
+    open_fire_archive,
+    split_byte_ranges,
+)
+from fire_validation import valid_rows
+from quantile_sketch import FireValueSketches, QUANTILE_COLUMNS, load_sketches, save_sketches
 
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
@@ -19,19 +53,26 @@ OUTPUT_DIR = REPO_ROOT / "data" / "preprocessed" / "vis2"
 YEARS = [2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
 SAMPLE_SIZE = 15000
 SEED_BASE = 401
+WORKERS = os.cpu_count() or 1
+FRP_EXPONENT = 1.0
+FRP_WEIGHT_FLOOR = 0.1  # MW; rows with missing or tiny FRP keep a small chance
+CHUNK_ROWS = 100_000  # validation chunk per reader; each worker holds one
 
 SOURCE_COLUMNS = ["latitude", "longitude", "acq_date", "type", "frp", "brightness"]
 OUT_COLUMNS = ["year", "latitude", "longitude", "type", "acq_date", "frp", "brightness"]
+WEIGHTED_OUT_COLUMNS = OUT_COLUMNS + ["sample_weight"]
+# value_quantiles = 1: the year has rows in fire_value_quantiles.csv (vis2 only
+# fetches that file when some year does)
+SUMMARY_COLUMNS = ["year", "valid_rows", "sample_rows", "sample_ratio", "weighting", "value_quantiles", "source_file"]
+SKETCH_PATH = OUTPUT_DIR / "fire_value_sketches.json"
+QUANTILES_PATH = OUTPUT_DIR / "fire_value_quantiles.csv"
+QUANTILE_FIELDS = ["year", "type", "metric", "count", "mean", "min", *QUANTILE_COLUMNS, "max"]
 
 
-def sanitize_row(row: dict[str, str], year: int) -> dict[str, str] | None:
-    try:
-        lat = float(row["latitude"])
-        lon = float(row["longitude"])
-    except (TypeError, ValueError, KeyError):
-        return None
-    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
-        return None
+def sanitize_row(row: dict[str, str], year: int) -> dict[str, str]:
+    """Normalised output row for a row ``fire_validation.valid_rows`` passed."""
+    lat = float(row["latitude"])
+    lon = float(row["longitude"])
 
     out = {
         "year": str(year),
@@ -45,50 +86,225 @@ def sanitize_row(row: dict[str, str], year: int) -> dict[str, str] | None:
     return out
 
 
-def reservoir_sample(csv_path: Path, year: int, sample_size: int, seed: int) -> tuple[list[dict[str, str]], int]:
-    rng = random.Random(seed)
+def _reservoir_from_rows(
+    rows: Iterable[dict[str, str]], year: int, sample_size: int, rng: random.Random
+) -> tuple[list[dict[str, str]], int, FireValueSketches]:
     sample: list[dict[str, str]] = []
     valid_count = 0
+    sketches = FireValueSketches()
+
+    for row in rows:
+        valid_count += 1
+        sketches.add(row["type"].strip(), row["frp"], row["brightness"])
+        if len(sample) < sample_size:
+            sample.append(sanitize_row(row, year))
+        else:
+            j = rng.randrange(valid_count)
+            if j < sample_size:
+                sample[j] = sanitize_row(row, year)
+
+    return sample, valid_count, sketches.flush()
+
+
+def frp_weight(frp: str, exponent: float) -> float:
+    try:
+        value = float(frp)
+    except ValueError:
+        value = 0.0
+    if not value > FRP_WEIGHT_FLOOR:  # also catches NaN
+        value = FRP_WEIGHT_FLOOR
+    return value ** exponent
+
+
+def _weighted_reservoir_from_rows(
+    rows: Iterable[dict[str, str]], year: int, sample_size: int, rng: random.Random, exponent: float
+) -> tuple[list[tuple[float, int, float, dict[str, str]]], int, FireValueSketches]:
+    """A-ExpJ weighted reservoir (Efraimidis & Spirakis), one pass.
+
+    Each row gets the key ``u ** (1 / w)``. The ``sample_size + 1`` largest
+    keys are kept in a min-heap, stored as logs for precision. The extra
+    entry is the threshold that ``finalize_weighted`` needs for inclusion
+    probabilities. Instead of drawing a key for every row, the scan jumps
+    over an exponentially distributed amount of weight between
+    replacements. Returns the heap entries ``(log_key, seq, weight, row)``.
+    """
+    heap: list[tuple[float, int, float, dict[str, str]]] = []
+    capacity = sample_size + 1
+    valid_count = 0
+    skip = 0.0
+    sketches = FireValueSketches()
+
+    for row in rows:
+        valid_count += 1
+        sketches.add(row["type"].strip(), row["frp"], row["brightness"])
+        weight = frp_weight(row["frp"], exponent)
+        if len(heap) < capacity:
+            key = math.log(1.0 - rng.random()) / weight
+            heapq.heappush(heap, (key, valid_count, weight, sanitize_row(row, year)))
+            if len(heap) == capacity:
+                skip = math.log(1.0 - rng.random()) / heap[0][0]
+            continue
+        skip -= weight
+        if skip > 0:
+            continue
+        # The new key is drawn conditioned on beating the current minimum
+        threshold = math.exp(weight * heap[0][0])
+        key = rng.uniform(threshold, 1.0)
+        heapq.heapreplace(heap, (math.log(key) / weight, valid_count, weight, sanitize_row(row, year)))
+        skip = math.log(1.0 - rng.random()) / heap[0][0]
+
+    return heap, valid_count, sketches.flush()
+
 
-    with csv_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row_out = sanitize_row(row, year)
-            if row_out is None:
-                continue
-            valid_count += 1
-            if len(sample) < sample_size:
-                sample.append(row_out)
-            else:
-                j = rng.randrange(valid_count)
-                if j < sample_size:
-                    sample[j] = row_out
+def finalize_weighted(
+    entries: list[tuple[float, int, float, dict[str, str]]], sample_size: int
+) -> list[dict[str, str]]:
+    """Top ``sample_size`` keys, each with ``sample_weight`` = 1 / inclusion probability.
 
-    return sample, valid_count
+    ``-log_key`` is an exponential rank with rate ``w``, so keeping the
+    largest keys is a bottom-k PPSWOR sample. Conditioned on the
+    (k+1)-th rank ``tau``, row i was included with probability
+    ``1 - exp(-w_i * tau)``, which makes weighted sums unbiased estimates.
+    """
+    ordered = heapq.nlargest(sample_size + 1, entries, key=lambda entry: entry[0])
+    tau = -ordered[sample_size][0] if len(ordered) > sample_size else math.inf
+    sample = []
+    for _, _, weight, row in ordered[:sample_size]:
+        inclusion = -math.expm1(-weight * tau) if math.isfinite(tau) else 1.0
+        sample.append({**row, "sample_weight": f"{1.0 / inclusion:.4f}"})
+    return sample
+
+
+def reservoir_sample(
+    csv_path: Path, year: int, sample_size: int, seed: int, frp_exponent: float | None = None
+) -> tuple[list[dict[str, str]], int, FireValueSketches, ReadStats]:
+    rng = random.Random(seed)
+    archive = open_fire_archive(csv_path)
+    with archive as f:
+        rows = valid_rows(f.readline(), f, CHUNK_ROWS)
+        if frp_exponent is None:
+            sample, valid_count, sketches = _reservoir_from_rows(rows, year, sample_size, rng)
+        else:
+            entries, valid_count, sketches = _weighted_reservoir_from_rows(rows, year, sample_size, rng, frp_exponent)
+            sample = finalize_weighted(entries, sample_size)
+            random.Random(seed).shuffle(sample)
+
+    return sample, valid_count, sketches, archive.stats
+
+
+def _sample_byte_range(
+    task: tuple[Path, list[str], int, int, int, int, int, float | None]
+) -> tuple[list, int, FireValueSketches]:
+    csv_path, fieldnames, start, end, year, sample_size, seed, frp_exponent = task
+    rows = valid_rows(",".join(fieldnames) + "\n", iter_range_lines(csv_path, start, end), CHUNK_ROWS)
+    if frp_exponent is None:
+        return _reservoir_from_rows(rows, year, sample_size, random.Random(seed))
+    return _weighted_reservoir_from_rows(rows, year, sample_size, random.Random(seed), frp_exponent)
+
+
+def merge_reservoirs(
+    parts: list[tuple[list[dict[str, str]], int]], sample_size: int, rng: random.Random
+) -> list[dict[str, str]]:
+    """Combine per-range reservoirs into one uniform sample of the union.
+
+    Each part is a uniform sample of its own ``valid_count`` rows. Slots are
+    allocated to parts by drawing without replacement from the pooled valid
+    rows (a multivariate hypergeometric draw), then each part contributes a
+    uniform subsample of that size, matching a single serial reservoir pass.
+    """
+    remaining = [valid_count for _, valid_count in parts]
+    total = sum(remaining)
+    take = [0] * len(parts)
+    for _ in range(min(sample_size, total)):
+        r = rng.randrange(total)
+        for i, left in enumerate(remaining):
+            if r < left:
+                break
+            r -= left
+        take[i] += 1
+        remaining[i] -= 1
+        total -= 1
+
+    merged: list[dict[str, str]] = []
+    for (sample, _), k in zip(parts, take):
+        merged.extend(rng.sample(sample, k))
+    rng.shuffle(merged)
+    return merged
+
+
+def parallel_reservoir_sample(
+    csv_path: Path,
+    year: int,
+    sample_size: int,
+    seed: int,
+    workers: int = WORKERS,
+    frp_exponent: float | None = None,
+) -> tuple[list[dict[str, str]], int, FireValueSketches, ReadStats]:
+    """Reservoir-sample one archive using ``workers`` byte-range readers.
+
+    Falls back to the serial streaming reader for compressed archives, which
+    cannot be seeked into. Weighted parts merge exactly: the global top keys
+    are among the per-part top keys.
+    """
+    if workers <= 1 or archive_format(csv_path) != "csv":
+        return reservoir_sample(csv_path, year, sample_size, seed, frp_exponent)
+
+    start_time = time.perf_counter()
+    fieldnames, ranges = split_byte_ranges(csv_path, workers)
+    tasks = [
+        (csv_path, fieldnames, lo, hi, year, sample_size, seed * 1000 + i, frp_exponent)
+        for i, (lo, hi) in enumerate(ranges)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_sample_byte_range, tasks))
+
+    if frp_exponent is None:
+        sample = merge_reservoirs([(part, count) for part, count, _ in parts], sample_size, random.Random(seed))
+    else:
+        sample = finalize_weighted([entry for part, _, _ in parts for entry in part], sample_size)
+        random.Random(seed).shuffle(sample)
+    valid_count = sum(count for _, count, _ in parts)
+    sketches = FireValueSketches()
+    for _, _, part_sketches in parts:
+        sketches.merge(part_sketches)
+    size = csv_path.stat().st_size
+    stats = ReadStats(source_bytes=size, csv_bytes=size, seconds=time.perf_counter() - start_time)
+    return sample, valid_count, sketches, stats
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Build vis2 yearly fire point samples.")
+    parser.add_argument("--frp-weighted", action="store_true", help="sample proportional to frp ** exponent")
+    parser.add_argument("--frp-exponent", type=float, default=FRP_EXPONENT, help="weight exponent (default 1.0)")
+    args = parser.parse_args()
+    frp_exponent = args.frp_exponent if args.frp_weighted else None
+    weighting = "uniform" if frp_exponent is None else f"frp^{frp_exponent:g}"
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     summary_rows: list[dict[str, str]] = []
+    # Years whose archive is missing keep their previously stored sketches
+    sketches_by_year = load_sketches(SKETCH_PATH)
 
     for year in YEARS:
-        input_path = INPUT_DIR / f"fire_archive_SV-C2_{year}.csv"
-        if not input_path.exists():
-            print(f"[skip] missing {input_path}")
+        input_path = find_year_archive(INPUT_DIR, year)
+        if input_path is None:
+            print(f"[skip] missing {INPUT_DIR / f'fire_archive_SV-C2_{year}.csv'} (or .csv.gz/.csv.zst/.zip, or inside a DL_FIRE_*.zip)")
             continue
 
-        sample, valid_count = reservoir_sample(
+        sample, valid_count, sketches, stats = parallel_reservoir_sample(
             csv_path=input_path,
             year=year,
             sample_size=SAMPLE_SIZE,
             seed=SEED_BASE + year,
+            frp_exponent=frp_exponent,
         )
 
         output_path = OUTPUT_DIR / f"fire_points_{year}.csv"
         with output_path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=OUT_COLUMNS)
+            writer = csv.DictWriter(f, fieldnames=OUT_COLUMNS if frp_exponent is None else WEIGHTED_OUT_COLUMNS)
             writer.writeheader()
             writer.writerows(sample)
+        sketches_by_year[year] = sketches
 
         summary_rows.append(
             {
@@ -96,21 +312,33 @@ def main() -> None:
                 "valid_rows": str(valid_count),
                 "sample_rows": str(len(sample)),
                 "sample_ratio": f"{(len(sample) / valid_count if valid_count else 0):.8f}",
+                "weighting": weighting,
+                "value_quantiles": "1",
                 "source_file": input_path.name,
             }
         )
         print(f"[ok] {year}: valid={valid_count}, sample={len(sample)} -> {output_path}")
+        print(
+            f"     read {stats.source_bytes / 1e6:.1f} MB -> {stats.csv_bytes / 1e6:.1f} MB csv "
+            f"in {stats.seconds:.1f}s ({stats.csv_mb_per_s:.1f} MB/s)"
+        )
 
     summary_path = OUTPUT_DIR / "sample_summary.csv"
     with summary_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["year", "valid_rows", "sample_rows", "sample_ratio", "source_file"],
-        )
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
         writer.writeheader()
         writer.writerows(summary_rows)
     print(f"[ok] wrote {summary_path}")
 
+    if sketches_by_year:
+        save_sketches(SKETCH_PATH, sketches_by_year)
+        with QUANTILES_PATH.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=QUANTILE_FIELDS)
+            writer.writeheader()
+            for year in sorted(sketches_by_year):
+                writer.writerows(sketches_by_year[year].summary_rows(year))
+        print(f"[ok] wrote {SKETCH_PATH} and {QUANTILES_PATH}")
+
 
 if __name__ == "__main__":
     main()
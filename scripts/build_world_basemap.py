@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Build the local world basemap used by vis2 at several levels of detail.
+
+Reads the world-atlas ``countries-110m.json`` TopoJSON. It is downloaded
+once into ``data/basemap/`` if it is not already there (``--download URL``
+fetches it again, which is how ``run_pipeline.py`` runs it). For each level
+this script:
+- simplifies every arc with Douglas-Peucker, keeping arc end points so
+  shared borders stay shared
+- at coarse levels, drops small islands, keeping each country's largest
+  polygon so no country disappears
+- re-quantizes to a coarser integer grid and prunes unused arcs
+
+Each level is written as ``data/basemap/world-110m.<level>.json``.
+
+vis2 draws the map and the resting globe from ``detail``. It switches the
+globe to ``coarse`` while it is rotating or playing through years.
+
+    python3 scripts/build_world_basemap.py [--download URL]
+
+Run from repository root.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASEMAP_DIR = REPO_ROOT / "data" / "basemap"
+SOURCE_PATH = BASEMAP_DIR / "countries-110m.json"
+SOURCE_URL = "https://cdn.jsdelivr.net/npm/world-atlas@2/countries-110m.json"
+OBJECT_NAME = "countries"
+
+# tolerance: Douglas-Peucker distance in degrees
+# quantization: integer grid size per axis
+# min_ring_area: polygons with a smaller outer ring (square degrees) are dropped
+LEVELS = {
+    "detail": {"tolerance": 0.05, "quantization": 10_000, "min_ring_area": 0.0},
+    "coarse": {"tolerance": 0.3, "quantization": 3_000, "min_ring_area": 1.0},
+}
+
+
+def download_source(url: str = SOURCE_URL) -> None:
+    BASEMAP_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"[download] {url}")
+    with urllib.request.urlopen(url, timeout=60) as response:
+        SOURCE_PATH.write_bytes(response.read())
+
+
+def fetch_source() -> dict:
+    if not SOURCE_PATH.exists():
+        download_source()
+    return json.loads(SOURCE_PATH.read_text(encoding="utf-8"))
+
+
+def decode_arcs(topo: dict) -> list[np.ndarray]:
+    """Absolute lon/lat coordinates of every arc."""
+    transform = topo.get("transform")
+    arcs = []
+    for arc in topo["arcs"]:
+        points = np.asarray(arc, dtype=np.float64)[:, :2]
+        if transform:
+            points = np.cumsum(points, axis=0) * transform["scale"] + transform["translate"]
+        arcs.append(points)
+    return arcs
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    if tolerance <= 0 or len(points) <= 2:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        segment = b - a
+        inner = points[start + 1:end] - a
+        length = np.hypot(*segment)
+        if length == 0:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dist = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def _arc_points(arcs: list[np.ndarray], ref: int) -> np.ndarray:
+    return arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+
+
+def ring_area(arcs: list[np.ndarray], ring: list[int]) -> float:
+    """Planar shoelace area of a ring in square degrees."""
+    points = np.concatenate([_arc_points(arcs, ref) for ref in ring])
+    x, y = points[:, 0], points[:, 1]
+    return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))) / 2
+
+
+def drop_small_polygons(geometry: dict, arcs: list[np.ndarray], min_area: float) -> dict:
+    if min_area <= 0 or geometry.get("type") != "MultiPolygon":
+        return geometry
+    polygons = geometry["arcs"]
+    areas = [ring_area(arcs, polygon[0]) for polygon in polygons]
+    kept = [polygon for polygon, area in zip(polygons, areas) if area >= min_area]
+    if not kept:
+        kept = [polygons[int(np.argmax(areas))]]
+    if len(kept) == 1:
+        return {**geometry, "type": "Polygon", "arcs": kept[0]}
+    return {**geometry, "arcs": kept}
+
+
+def _rings(geometry: dict):
+    if geometry.get("type") == "Polygon":
+        yield from geometry["arcs"]
+    elif geometry.get("type") == "MultiPolygon":
+        for polygon in geometry["arcs"]:
+            yield from polygon
+
+
+def _remap(geometry: dict, new_index: dict[int, int]) -> dict:
+    def ref(r: int) -> int:
+        return new_index[r] if r >= 0 else ~new_index[~r]
+
+    if geometry.get("type") == "Polygon":
+        arcs = [[ref(r) for r in ring] for ring in geometry["arcs"]]
+    elif geometry.get("type") == "MultiPolygon":
+        arcs = [[[ref(r) for r in ring] for ring in polygon] for polygon in geometry["arcs"]]
+    else:
+        return geometry
+    return {**geometry, "arcs": arcs}
+
+
+def quantize(arcs: list[np.ndarray], quantization: int) -> tuple[dict, list[list[list[int]]]]:
+    """Delta-encoded integer arcs plus the TopoJSON transform to decode them."""
+    allpoints = np.concatenate(arcs)
+    lo = allpoints.min(axis=0)
+    span = np.maximum(allpoints.max(axis=0) - lo, 1e-12)
+    scale = span / (quantization - 1)
+    encoded = []
+    for arc in arcs:
+        q = np.round((arc - lo) / scale).astype(np.int64)
+        # Drop points that collapse onto their predecessor, keeping both ends
+        moved = np.any(np.diff(q, axis=0) != 0, axis=1)
+        keep = np.concatenate([[True], moved])
+        keep[-1] = True
+        q = q[keep]
+        encoded.append(np.diff(q, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).tolist())
+    transform = {"scale": [float(s) for s in scale], "translate": [float(t) for t in lo]}
+    return transform, encoded
+
+
+def build_level(topo: dict, tolerance: float, quantization: int, min_ring_area: float) -> dict:
+    arcs = [douglas_peucker(arc, tolerance) for arc in decode_arcs(topo)]
+    geometries = [
+        drop_small_polygons(geometry, arcs, min_ring_area)
+        for geometry in topo["objects"][OBJECT_NAME]["geometries"]
+    ]
+
+    used = sorted({r if r >= 0 else ~r for geometry in geometries for ring in _rings(geometry) for r in ring})
+    new_index = {old: new for new, old in enumerate(used)}
+    geometries = [_remap(geometry, new_index) for geometry in geometries]
+    transform, encoded = quantize([arcs[i] for i in used], quantization)
+
+    return {
+        "type": "Topology",
+        "transform": transform,
+        "objects": {OBJECT_NAME: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": encoded,
+    }
+
+
+def _stats(topo: dict) -> tuple[int, int, int]:
+    geometries = topo["objects"][OBJECT_NAME]["geometries"]
+    rings = sum(1 for geometry in geometries for _ in _rings(geometry))
+    points = sum(len(arc) for arc in topo["arcs"])
+    return len(topo["arcs"]), rings, points
+
+
+def main() -> None:
+    if len(sys.argv) == 3 and sys.argv[1] == "--download":
+        download_source(sys.argv[2])
+    topo = fetch_source()
+    arcs, rings, points = _stats(topo)
+    print(f"[source] {SOURCE_PATH.name}: {arcs} arcs, {rings} rings, {points} points, "
+          f"{SOURCE_PATH.stat().st_size:,} bytes")
+    for level, params in LEVELS.items():
+        out = build_level(topo, **params)
+        path = BASEMAP_DIR / f"world-110m.{level}.json"
+        path.write_text(json.dumps(out, separators=(",", ":")), encoding="utf-8")
+        arcs, rings, points = _stats(out)
+        print(f"[ok] {path.relative_to(REPO_ROOT)}: {arcs} arcs, {rings} rings, {points} points, "
+              f"{path.stat().st_size:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
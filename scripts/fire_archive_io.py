@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Open raw NASA VIIRS fire archives, plain or compressed.
+
+Yearly archives may be stored as ``.csv``, ``.csv.gz``, ``.csv.zst`` or as a
+FIRMS ``.zip`` download bundle. Compressed inputs are decompressed as a
+stream on a background thread (zlib and zstandard release the GIL), so CSV
+parsing on the main thread is not stalled waiting for decompression.
+
+Run directly to compare read throughput of compressed archives against
+their uncompressed equivalent:
+
+    python3 scripts/fire_archive_io.py data/wild_fire_nasa/fire_archive_SV-C2_2025.csv.gz
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .csv.zst archives
+    zstandard = None
+
+
+ARCHIVE_SUFFIXES = [".csv", ".csv.gz", ".csv.zst", ".zip"]
+# FIRMS download bundles are named DL_FIRE_<source>_<request id>.zip
+ARCHIVE_GLOBS = [f"fire_archive*{suffix}" for suffix in ARCHIVE_SUFFIXES] + ["DL_FIRE_*.zip"]
+CHUNK_SIZE = 1 << 20
+QUEUE_CHUNKS = 8
+
+_EOF = object()
+
+
+@dataclass
+class ReadStats:
+    """Byte counters for one archive read, filled in as the stream is consumed."""
+
+    source_bytes: int = 0
+    csv_bytes: int = 0
+    seconds: float = 0.0
+
+    def add_source_bytes(self, n: int) -> None:
+        self.source_bytes += n
+
+    def add_csv_bytes(self, n: int) -> None:
+        self.csv_bytes += n
+
+    @property
+    def csv_mb_per_s(self) -> float:
+        return self.csv_bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.csv_bytes / self.source_bytes if self.source_bytes else 0.0
+
+
+def archive_format(path: Path) -> str:
+    name = path.name.lower()
+    if name.endswith(".csv.gz"):
+        return "gzip"
+    if name.endswith(".csv.zst"):
+        return "zstd"
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith(".csv"):
+        return "csv"
+    raise ValueError(f"unsupported fire archive format: {path.name}")
+
+
+def archive_stem(path: Path) -> str:
+    """File name without any of the supported archive suffixes."""
+    name = path.name
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return path.stem
+
+
+def archive_key(path: Path) -> str:
+    """Name of the CSV an archive holds; a FIRMS bundle is keyed by its archive member."""
+    if archive_format(path) == "zip":
+        with zipfile.ZipFile(path) as bundle:
+            return archive_stem(Path(_zip_member(bundle)))
+    return archive_stem(path)
+
+
+def find_year_archive(input_dir: Path, year: int) -> Path | None:
+    """Locate ``fire_archive_SV-C2_{year}`` in any supported format (including inside
+    a ``DL_FIRE_*.zip`` bundle), plain CSV first."""
+    return _archives_by_key(input_dir).get(f"fire_archive_SV-C2_{year}")
+
+
+def list_archives(input_dir: Path) -> list[Path]:
+    """All fire archives in ``input_dir``, one per CSV; a plain CSV wins over its
+    compressed copies and over a bundle it was extracted from."""
+    by_key = _archives_by_key(input_dir)
+    return [by_key[key] for key in sorted(by_key)]
+
+
+def _archives_by_key(input_dir: Path) -> dict[str, Path]:
+    by_key: dict[str, Path] = {}
+    for pattern in ARCHIVE_GLOBS:
+        for path in sorted(input_dir.glob(pattern)):
+            by_key.setdefault(archive_key(path), path)
+    return by_key
+
+
+def _zip_member(bundle: zipfile.ZipFile) -> str:
+    """Pick the archive CSV from a FIRMS bundle (which also ships NRT CSVs and a readme)."""
+    csv_members = [name for name in bundle.namelist() if name.lower().endswith(".csv")]
+    if not csv_members:
+        raise ValueError(f"no CSV member in {bundle.filename}")
+    archive_members = [name for name in csv_members if Path(name).name.startswith("fire_archive")]
+    return sorted(archive_members or csv_members)[0]
+
+
+class _CountingReader(io.RawIOBase):
+    """Pass-through reader that reports the number of bytes pulled through it."""
+
+    def __init__(self, raw: BinaryIO, on_read: Callable[[int], None]) -> None:
+        self._raw = raw
+        self._on_read = on_read
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self._on_read(n)
+        return n
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+class _BundleMember(io.RawIOBase):
+    """One member of a zip bundle; closing it also closes the bundle."""
+
+    def __init__(self, bundle: zipfile.ZipFile, name: str) -> None:
+        self._bundle = bundle
+        self._member = bundle.open(name)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._member.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._member.close()
+            self._bundle.close()
+        super().close()
+
+
+def _open_decompressed(path: Path, stats: ReadStats) -> BinaryIO:
+    """Open ``path`` as a binary stream of CSV bytes, decompressing inline."""
+    fmt = archive_format(path)
+    if fmt == "zip":
+        bundle = zipfile.ZipFile(path)
+        try:
+            name = _zip_member(bundle)
+            stats.source_bytes = bundle.getinfo(name).compress_size
+            return _BundleMember(bundle, name)
+        except BaseException:
+            bundle.close()
+            raise
+    raw = _CountingReader(path.open("rb"), stats.add_source_bytes)
+    if fmt == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if fmt == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"reading {path.name} requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_size=CHUNK_SIZE, closefd=True)
+    return raw
+
+
+class ThreadedDecompressReader(io.RawIOBase):
+    """Binary stream fed by a producer thread through a bounded queue of chunks."""
+
+    def __init__(self, opener: Callable[[], BinaryIO], chunk_size: int = CHUNK_SIZE,
+                 max_chunks: int = QUEUE_CHUNKS) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._pending = memoryview(b"")
+        self._done = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._pump, args=(opener, chunk_size), daemon=True)
+        self._thread.start()
+
+    def _pump(self, opener: Callable[[], BinaryIO], chunk_size: int) -> None:
+        try:
+            with opener() as src:
+                while not self._stop.is_set():
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    self._queue.put(chunk)
+        except BaseException as exc:  # re-raised on the consumer thread
+            self._queue.put(exc)
+        finally:
+            self._queue.put(_EOF)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._done:
+            item = self._queue.get()
+            if item is _EOF:
+                self._done = True
+            elif isinstance(item, BaseException):
+                self._done = True
+                raise item
+            else:
+                self._pending = memoryview(item)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # Drain so a producer blocked on a full queue can observe the stop flag.
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+        super().close()
+
+
+class FireArchive:
+    """Context manager yielding a text stream over a (possibly compressed) archive.
+
+    ``stats`` is updated while the stream is read and finalised on exit.
+    """
+
+    def __init__(self, path: Path, threaded: bool = True) -> None:
+        self.path = path
+        self.threaded = threaded and archive_format(path) != "csv"
+        self.stats = ReadStats()
+        self._text: io.TextIOWrapper | None = None
+        self._start = 0.0
+
+    def __enter__(self) -> io.TextIOWrapper:
+        self._start = time.perf_counter()
+        opener = partial(_open_decompressed, self.path, self.stats)
+        source = ThreadedDecompressReader(opener) if self.threaded else opener()
+        binary = io.BufferedReader(_CountingReader(source, self.stats.add_csv_bytes), buffer_size=CHUNK_SIZE)
+        self._text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        return self._text
+
+    def __exit__(self, *exc_info) -> None:
+        assert self._text is not None
+        self._text.close()
+        self.stats.seconds = time.perf_counter() - self._start
+        if archive_format(self.path) == "csv":
+            self.stats.source_bytes = self.stats.csv_bytes
+
+
+def open_fire_archive(path: Path, threaded: bool = True) -> FireArchive:
+    return FireArchive(path, threaded=threaded)
+
+
+def iter_archive_rows(path: Path) -> Iterator[dict[str, str]]:
+    with open_fire_archive(path) as f:
+        yield from csv.DictReader(f)
+
+
+def split_byte_ranges(path: Path, parts: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """Split an uncompressed CSV into ``parts`` newline-aligned byte ranges.
+
+    Returns the header fields and ``(start, end)`` offsets covering every data
+    row exactly once. Rows are assumed not to contain quoted newlines, which
+    holds for FIRMS archives.
+    """
+    if archive_format(path) != "csv":
+        raise ValueError(f"byte-range reads need an uncompressed CSV, got {path.name}")
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        boundaries = [data_start]
+        step = max((size - data_start) // max(parts, 1), 1)
+        for i in range(1, parts):
+            f.seek(max(data_start + i * step - 1, boundaries[-1]))
+            f.readline()  # move to the start of the next full line
+            boundaries.append(min(f.tell(), size))
+        boundaries.append(size)
+    fieldnames = next(csv.reader([header.decode("utf-8-sig")]))
+    ranges = [(lo, hi) for lo, hi in zip(boundaries, boundaries[1:]) if hi > lo]
+    return fieldnames, ranges
+
+
+def iter_range_lines(path: Path, start: int, end: int) -> Iterator[str]:
+    """Yield the lines whose first byte lies in ``[start, end)``, decoded."""
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            line = f.readline()
+            if not line:
+                return
+            remaining -= len(line)
+            yield line.decode("utf-8")
+
+
+def _time_csv_read(archive: FireArchive) -> tuple[ReadStats, int]:
+    rows = 0
+    with archive as f:
+        for _ in csv.reader(f):
+            rows += 1
+    return archive.stats, max(rows - 1, 0)
+
+
+def benchmark(path: Path) -> None:
+    """Print CSV parse throughput for threaded, inline and uncompressed reads of ``path``."""
+    print(f"{path.name} ({archive_format(path)}, {path.stat().st_size / 1e6:.1f} MB on disk)")
+    results = [("threaded", *_time_csv_read(open_fire_archive(path, threaded=True)))]
+    if archive_format(path) != "csv":
+        results.append(("inline", *_time_csv_read(open_fire_archive(path, threaded=False))))
+        with tempfile.TemporaryDirectory() as tmp:
+            plain = Path(tmp) / f"{archive_stem(path)}.csv"
+            with open_fire_archive(path) as src, plain.open("w", newline="", encoding="utf-8") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            results.append(("uncompressed", *_time_csv_read(open_fire_archive(plain))))
+
+    baseline = results[-1][1].seconds
+    for label, stats, rows in results:
+        relative = baseline / stats.seconds if stats.seconds else 0.0
+        print(
+            f"  {label:<13} rows={rows:>11,} csv={stats.csv_bytes / 1e6:9.1f} MB "
+            f"read={stats.source_bytes / 1e6:9.1f} MB {stats.seconds:7.2f}s "
+            f"{stats.csv_mb_per_s:7.1f} MB/s  {rows / stats.seconds if stats.seconds else 0:11,.0f} rows/s "
+            f"{relative:5.2f}x uncompressed speed"
+        )
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    for arg in sys.argv[1:]:
+        benchmark(Path(arg))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Schema validation for raw NASA VIIRS fire archives, with a quarantine file.
+
+Each row must satisfy:
+- latitude, longitude, frp and brightness parse as floats within range
+- acq_date is a real YYYY-MM-DD date
+- type is one of 0-3
+
+The rules live in one table. ``validate_chunk`` applies them to a whole
+pandas chunk with vectorised operations. ``row_reasons`` applies the same
+table to one CSV row and backs ``--check``. ``valid_rows`` yields the rows of
+a CSV stream that pass, validated a chunk at a time; the vis2 sampler reads
+archives through it.
+
+Running the module validates every archive in ``data/wild_fire_nasa/``.
+Rejected rows go to ``data/preprocessed/quarantine/<archive>.csv`` with their
+line number and reason codes. Per-reason counters go to
+``quarantine/validation_report.csv``.
+
+    python3 scripts/fire_validation.py [archive ...]
+    python3 scripts/fire_validation.py --check   # vectorised vs per-row rules
+
+Run from repository root.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from fire_archive_io import archive_stem, list_archives, open_fire_archive
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INPUT_DIR = REPO_ROOT / "data" / "wild_fire_nasa"
+QUARANTINE_DIR = REPO_ROOT / "data" / "preprocessed" / "quarantine"
+REPORT_PATH = QUARANTINE_DIR / "validation_report.csv"
+CHUNK_ROWS = 500_000
+
+# column: (low, high), inclusive
+NUMERIC_RULES = {
+    "latitude": (-90.0, 90.0),
+    "longitude": (-180.0, 180.0),
+    "frp": (0.0, 100_000.0),
+    "brightness": (150.0, 500.0),  # Kelvin; VIIRS I4 saturates near 367 K
+}
+DATE_COLUMN = "acq_date"
+DATE_FORMAT = "%Y-%m-%d"
+TYPE_COLUMN = "type"
+FIRE_TYPES = ("0", "1", "2", "3")
+COLUMNS = [*NUMERIC_RULES, DATE_COLUMN, TYPE_COLUMN]
+# Read as text so they compare as written (e.g. acq_time "0130"); type too, or
+# a chunk where it has a gap becomes float64 and "2" reads as 2.0
+TEXT_COLUMNS = {
+    DATE_COLUMN: str,
+    TYPE_COLUMN: str,
+    "acq_time": str,
+    "satellite": str,
+    "version": str,
+    "daynight": str,
+}
+
+REASONS = [f"bad_{column}" for column in COLUMNS]
+REASON_BITS = {reason: 1 << i for i, reason in enumerate(REASONS)}
+
+
+def row_reasons(row: dict[str, str]) -> list[str]:
+    """Reason codes for one DictReader row; empty when the row is valid."""
+    reasons = []
+    for column, (low, high) in NUMERIC_RULES.items():
+        try:
+            value = float(row[column])
+        except (TypeError, ValueError, KeyError):
+            reasons.append(f"bad_{column}")
+            continue
+        if not low <= value <= high:  # also rejects NaN
+            reasons.append(f"bad_{column}")
+    acq_date = str(row.get(DATE_COLUMN, ""))
+    try:
+        # fromisoformat alone also accepts YYYYMMDD
+        if len(acq_date) != 10 or acq_date[4] != "-" or acq_date[7] != "-":
+            raise ValueError(acq_date)
+        date.fromisoformat(acq_date)
+    except ValueError:
+        reasons.append(f"bad_{DATE_COLUMN}")
+    if str(row.get(TYPE_COLUMN, "")).strip() not in FIRE_TYPES:
+        reasons.append(f"bad_{TYPE_COLUMN}")
+    return reasons
+
+
+def validate_chunk(chunk: pd.DataFrame) -> np.ndarray:
+    """Bitmask of failed rules per row (0 = valid), see ``REASON_BITS``."""
+    masks = np.zeros(len(chunk), dtype=np.uint16)
+    for column, (low, high) in NUMERIC_RULES.items():
+        if column not in chunk:
+            masks |= REASON_BITS[f"bad_{column}"]
+            continue
+        values = chunk[column]
+        if not pd.api.types.is_float_dtype(values) and not pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            ok = (values >= low) & (values <= high)
+        masks[~ok] |= REASON_BITS[f"bad_{column}"]
+
+    if DATE_COLUMN in chunk:
+        dates = chunk[DATE_COLUMN]
+        ok = pd.to_datetime(dates, format=DATE_FORMAT, errors="coerce").notna() & (dates.str.len() == 10)
+        masks[~ok.fillna(False).to_numpy(dtype=bool)] |= REASON_BITS[f"bad_{DATE_COLUMN}"]
+    else:
+        masks |= REASON_BITS[f"bad_{DATE_COLUMN}"]
+
+    if TYPE_COLUMN in chunk:
+        types = chunk[TYPE_COLUMN]
+        if pd.api.types.is_numeric_dtype(types):  # frames not read via read_chunks
+            ok = types.isin([int(t) for t in FIRE_TYPES])
+        else:
+            ok = types.astype("string").str.strip().isin(FIRE_TYPES)
+        masks[~ok.fillna(False).to_numpy(dtype=bool)] |= REASON_BITS[f"bad_{TYPE_COLUMN}"]
+    else:
+        masks |= REASON_BITS[f"bad_{TYPE_COLUMN}"]
+    return masks
+
+
+def read_chunks(f, chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple[pd.DataFrame, list[str]]]:
+    """``(chunk, lines)`` pairs over an open archive: the parsed rows and their raw text."""
+    return line_chunks(f.readline(), f, chunk_rows)
+
+
+def line_chunks(header: str, lines: Iterable[str],
+                chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple[pd.DataFrame, list[str]]]:
+    """Parse ``chunk_rows`` CSV lines at a time into the frames ``validate_chunk`` expects.
+
+    The raw lines come back with each chunk so rejected rows can be written
+    as they appear in the archive. Rows are assumed not to contain quoted
+    newlines, which holds for FIRMS archives.
+    """
+    lines = iter(lines)
+    while block := list(islice(lines, chunk_rows)):
+        # Numeric columns keep pandas' C float parser; a column only falls
+        # back to strings (and to_numeric) in chunks that contain bad values
+        chunk = pd.read_csv(
+            io.BytesIO((header + "".join(block)).encode("utf-8")),
+            dtype=TEXT_COLUMNS, keep_default_na=False, na_values=[""], skip_blank_lines=False, low_memory=False,
+        )
+        if len(chunk) != len(block):
+            raise ValueError(f"parsed {len(chunk)} rows from {len(block)} lines; quoted newline in a row?")
+        yield chunk, block
+
+
+def valid_rows(header: str, lines: Iterable[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[dict[str, str]]:
+    """DictReader-style rows (original text) of the lines that pass every rule."""
+    fieldnames = next(csv.reader([header]))
+    for chunk, block in line_chunks(header, lines, chunk_rows):
+        passed = np.flatnonzero(validate_chunk(chunk) == 0)
+        for values in csv.reader(block[i] for i in passed):
+            yield dict(zip(fieldnames, values))
+
+
+def describe(mask: int) -> str:
+    return "|".join(reason for reason, bit in REASON_BITS.items() if mask & bit)
+
+
+@dataclass
+class ValidationReport:
+    """Row and per-reason rejection counters for one or more archives."""
+
+    rows: int = 0
+    quarantined: int = 0
+    reasons: dict[str, int] = field(default_factory=lambda: dict.fromkeys(REASONS, 0))
+    seconds: float = 0.0
+
+    def add(self, masks: np.ndarray) -> None:
+        self.rows += len(masks)
+        self.quarantined += int(np.count_nonzero(masks))
+        for reason, bit in REASON_BITS.items():
+            self.reasons[reason] += int(np.count_nonzero(masks & bit))
+
+    def merge(self, other: ValidationReport) -> ValidationReport:
+        self.rows += other.rows
+        self.quarantined += other.quarantined
+        for reason, count in other.reasons.items():
+            self.reasons[reason] += count
+        self.seconds += other.seconds
+        return self
+
+    @property
+    def valid(self) -> int:
+        return self.rows - self.quarantined
+
+    def as_row(self, archive: str) -> dict[str, str]:
+        row = {"archive": archive, "rows": str(self.rows), "valid": str(self.valid), "quarantined": str(self.quarantined)}
+        row.update({reason: str(count) for reason, count in self.reasons.items()})
+        return row
+
+
+def validate_archive(path: Path, quarantine_dir: Path = QUARANTINE_DIR) -> ValidationReport:
+    """Validate one archive; rejected rows are written to ``quarantine_dir/<stem>.csv``."""
+    report = ValidationReport()
+    quarantine_path = quarantine_dir / f"{archive_stem(path)}.csv"
+    quarantine_path.unlink(missing_ok=True)
+    start = time.perf_counter()
+    line = 2  # first data row, after the header
+    with open_fire_archive(path) as f:
+        header = f.readline()
+        for chunk, block in line_chunks(header, f):
+            masks = validate_chunk(chunk)
+            report.add(masks)
+            rejected = np.flatnonzero(masks)
+            if len(rejected):
+                quarantine_dir.mkdir(parents=True, exist_ok=True)
+                # Re-read the raw lines as text so values keep their spelling ("95", not "95.0")
+                bad = pd.read_csv(
+                    io.StringIO(header + "".join(block[i] for i in rejected)), dtype=str, keep_default_na=False,
+                    skip_blank_lines=False,
+                )
+                bad.insert(0, "reasons", [describe(int(m)) for m in masks[rejected]])
+                bad.insert(0, "line", rejected + line)
+                bad.to_csv(quarantine_path, mode="a", header=not quarantine_path.exists(), index=False)
+            line += len(chunk)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def write_report(reports: dict[str, ValidationReport], path: Path = REPORT_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["archive", "rows", "valid", "quarantined", *REASONS])
+        writer.writeheader()
+        for archive, report in reports.items():
+            writer.writerow(report.as_row(archive))
+
+
+CHECK_HEADER = "latitude,longitude,brightness,acq_date,acq_time,satellite,type,frp,daynight"
+# Each chunk mixes valid rows with gaps and malformed values, so columns come
+# back as floats in some chunks and as strings in others
+CHECK_ROWS = [
+    "10.5,20.25,300.1,2021-07-01,0130,N,0,5.2,D",
+    "-33.0,151.0,320.0,2021-07-02,1200,N,2,1.0,N",
+    "10.5,20.25,300.1,2021-07-01,0130,N,,5.2,D",
+    "10.5,20.25,300.1,2021-07-01,0130,N,2.0,5.2,D",
+    "10.5,20.25,300.1,2021-07-01,0130,N, 3 ,5.2,D",
+    "10.5,20.25,300.1,2021-07-01,0130,N,4,5.2,D",
+    "10.5,20.25,300.1,2021-07-01,0130,N,x,5.2,D",
+    ",20.25,300.1,2021-07-01,0130,N,1,5.2,D",
+    "95.0,20.25,300.1,2021-07-01,0130,N,1,5.2,D",
+    "10.5,abc,300.1,2021-07-01,0130,N,1,5.2,D",
+    "10.5,20.25,,2021-07-01,0130,N,1,,D",
+    "10.5,20.25,100.0,2021-07-01,0130,N,1,-1,D",
+    "10.5,20.25,300.1,,0130,N,1,5.2,D",
+    "10.5,20.25,300.1,20210701,0130,N,1,5.2,D",
+    "10.5,20.25,300.1,2021-02-30,0130,N,1,5.2,D",
+    "10.5,20.25,300.1,2021-7-1,0130,N,1,5.2,D",
+    "nan,inf,300.1,2021-07-01,0130,N,1,5.2,D",
+    "1e1,2E1,3.001e2,2021-07-01,0130,N,1,5.2,D",
+    ",,,,,,,,",
+    "-90,180,500,2021-12-31,2359,N,3,0,N",
+]
+
+
+def check(chunk_rows: tuple[int, ...] = (1, 2, 3, 5, len(CHECK_ROWS))) -> int:
+    """Compare ``validate_chunk`` with ``row_reasons`` on ``CHECK_ROWS``; returns the mismatch count."""
+    text = "\n".join([CHECK_HEADER, *CHECK_ROWS]) + "\n"
+    rows = list(csv.DictReader(io.StringIO(text)))
+    expected = [describe(sum(REASON_BITS[r] for r in row_reasons(row))) for row in rows]
+    passing = [row for row in rows if not row_reasons(row)]
+    mismatches = 0
+    for size in chunk_rows:
+        got = [describe(int(m)) for chunk, _ in read_chunks(io.StringIO(text), size) for m in validate_chunk(chunk)]
+        for line, (want, have) in enumerate(zip(expected, got), start=2):
+            if want != have:
+                mismatches += 1
+                print(f"[warn] chunk size {size}, line {line}: row_reasons={want!r} validate_chunk={have!r}")
+        kept = list(valid_rows(CHECK_HEADER + "\n", io.StringIO(text).readlines()[1:], size))
+        if kept != passing:
+            mismatches += 1
+            print(f"[warn] chunk size {size}: valid_rows kept {len(kept)} rows, row_reasons passes {len(passing)}")
+    print(f"[ok] {len(CHECK_ROWS)} rows x {len(chunk_rows)} chunk sizes, {mismatches} mismatches")
+    return mismatches
+
+
+def main() -> None:
+    if sys.argv[1:] == ["--check"]:
+        sys.exit(1 if check() else 0)
+    paths = [Path(arg) for arg in sys.argv[1:]] or list_archives(INPUT_DIR)
+    if not paths:
+        print(f"[skip] no archives in {INPUT_DIR}")
+        return
+    reports: dict[str, ValidationReport] = {}
+    total = ValidationReport()
+    for path in paths:
+        report = validate_archive(path)
+        reports[path.name] = report
+        total.merge(report)
+        top = ", ".join(f"{reason}={count}" for reason, count in report.reasons.items() if count)
+        print(
+            f"[ok] {path.name}: {report.rows} rows, {report.quarantined} quarantined"
+            f"{f' ({top})' if top else ''} in {report.seconds:.1f}s "
+            f"({report.rows / max(report.seconds, 1e-9) / 1e6:.2f} M rows/s)"
+        )
+    reports["total"] = total
+    write_report(reports)
+    print(f"[ok] wrote {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Assign VIIRS fire detections to countries and count them per country and year.
+
+Country polygons come from the world-atlas TopoJSON that
+``scripts/build_world_basemap.py`` keeps in ``data/basemap/``. A regular
+lat/lon grid is laid over them:
+- Cells no border passes through belong wholly to one country (or to none)
+  and are resolved with an array lookup.
+- Points in border cells get an exact even-odd ray test. The test only uses
+  the polygon edges that overlap the cell's latitude row.
+
+Chunks of points are geocoded in worker processes while the main process
+parses the next chunk.
+
+The output, ``data/preprocessed/fire_count_by_country_year.csv``, has one
+row per (year, country), for every year found in ``acq_date``; rows without a
+valid date are counted and reported, not geocoded. Country names match ``vis3/country_to_region.csv``
+where possible and the region is joined in. ISO3 codes come from the
+world-atlas numeric ids.
+
+    python3 scripts/geocode_fires.py                         # scan archives, write counts
+    python3 scripts/geocode_fires.py --benchmark [num_points]
+
+Run from repository root.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_world_basemap import OBJECT_NAME, _rings, decode_arcs, fetch_source
+from fire_archive_io import archive_format, list_archives, open_fire_archive, split_byte_ranges
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INPUT_DIR = REPO_ROOT / "data" / "wild_fire_nasa"
+PREPROCESSED_DIR = REPO_ROOT / "data" / "preprocessed"
+REGION_CSV = PREPROCESSED_DIR / "vis3" / "country_to_region.csv"
+OUTPUT_CSV = PREPROCESSED_DIR / "fire_count_by_country_year.csv"
+CELL_DEG = 1.0
+CHUNK_ROWS = 500_000
+RANGE_BYTES = 64 << 20  # plain CSVs are parsed by the workers in ranges of this size
+COLUMNS = ["latitude", "longitude", "acq_date"]
+MAX_CELLS_PER_TEST = 4_000_000  # points x edges evaluated at once in the exact test
+WORKERS = os.cpu_count() or 1
+UNASSIGNED = "Unassigned"
+BORDER = -2
+
+# world-atlas (Natural Earth) short names -> names used by country_to_region.csv / OWID
+NAME_ALIASES = {
+    "United States of America": "United States",
+    "Central African Rep.": "Central African Republic",
+    "Dem. Rep. Congo": "Democratic Republic of Congo",
+    "Dominican Rep.": "Dominican Republic",
+    "Eq. Guinea": "Equatorial Guinea",
+    "Solomon Is.": "Solomon Islands",
+    "S. Sudan": "South Sudan",
+    "Bosnia and Herz.": "Bosnia and Herzegovina",
+    "Côte d'Ivoire": "Cote d'Ivoire",
+    "Falkland Is.": "Falkland Islands",
+    "W. Sahara": "Western Sahara",
+    "N. Cyprus": "Northern Cyprus",
+    "Timor-Leste": "East Timor",
+    "eSwatini": "Eswatini",
+    "Macedonia": "North Macedonia",
+    "Fr. S. Antarctic Lands": "French Southern Territories",
+}
+
+# ISO 3166-1 numeric (the world-atlas feature ids) -> alpha-3
+ISO3_BY_NUMERIC = {
+    "004": "AFG", "008": "ALB", "010": "ATA", "012": "DZA", "016": "ASM", "020": "AND", "024": "AGO", "028": "ATG",
+    "031": "AZE", "032": "ARG", "036": "AUS", "040": "AUT", "044": "BHS", "048": "BHR", "050": "BGD", "051": "ARM",
+    "052": "BRB", "056": "BEL", "060": "BMU", "064": "BTN", "068": "BOL", "070": "BIH", "072": "BWA", "074": "BVT",
+    "076": "BRA", "084": "BLZ", "086": "IOT", "090": "SLB", "092": "VGB", "096": "BRN", "100": "BGR", "104": "MMR",
+    "108": "BDI", "112": "BLR", "116": "KHM", "120": "CMR", "124": "CAN", "132": "CPV", "136": "CYM", "140": "CAF",
+    "144": "LKA", "148": "TCD", "152": "CHL", "156": "CHN", "158": "TWN", "162": "CXR", "166": "CCK", "170": "COL",
+    "174": "COM", "175": "MYT", "178": "COG", "180": "COD", "184": "COK", "188": "CRI", "191": "HRV", "192": "CUB",
+    "196": "CYP", "203": "CZE", "204": "BEN", "208": "DNK", "212": "DMA", "214": "DOM", "218": "ECU", "222": "SLV",
+    "226": "GNQ", "231": "ETH", "232": "ERI", "233": "EST", "234": "FRO", "238": "FLK", "239": "SGS", "242": "FJI",
+    "246": "FIN", "248": "ALA", "250": "FRA", "254": "GUF", "258": "PYF", "260": "ATF", "262": "DJI", "266": "GAB",
+    "268": "GEO", "270": "GMB", "275": "PSE", "276": "DEU", "288": "GHA", "292": "GIB", "296": "KIR", "300": "GRC",
+    "304": "GRL", "308": "GRD", "312": "GLP", "316": "GUM", "320": "GTM", "324": "GIN", "328": "GUY", "332": "HTI",
+    "334": "HMD", "336": "VAT", "340": "HND", "344": "HKG", "348": "HUN", "352": "ISL", "356": "IND", "360": "IDN",
+    "364": "IRN", "368": "IRQ", "372": "IRL", "376": "ISR", "380": "ITA", "384": "CIV", "388": "JAM", "392": "JPN",
+    "398": "KAZ", "400": "JOR", "404": "KEN", "408": "PRK", "410": "KOR", "414": "KWT", "417": "KGZ", "418": "LAO",
+    "422": "LBN", "426": "LSO", "428": "LVA", "430": "LBR", "434": "LBY", "438": "LIE", "440": "LTU", "442": "LUX",
+    "446": "MAC", "450": "MDG", "454": "MWI", "458": "MYS", "462": "MDV", "466": "MLI", "470": "MLT", "474": "MTQ",
+    "478": "MRT", "480": "MUS", "484": "MEX", "492": "MCO", "496": "MNG", "498": "MDA", "499": "MNE", "500": "MSR",
+    "504": "MAR", "508": "MOZ", "512": "OMN", "516": "NAM", "520": "NRU", "524": "NPL", "528": "NLD", "531": "CUW",
+    "533": "ABW", "534": "SXM", "535": "BES", "540": "NCL", "548": "VUT", "554": "NZL", "558": "NIC", "562": "NER",
+    "566": "NGA", "570": "NIU", "574": "NFK", "578": "NOR", "580": "MNP", "581": "UMI", "583": "FSM", "584": "MHL",
+    "585": "PLW", "586": "PAK", "591": "PAN", "598": "PNG", "600": "PRY", "604": "PER", "608": "PHL", "612": "PCN",
+    "616": "POL", "620": "PRT", "624": "GNB", "626": "TLS", "630": "PRI", "634": "QAT", "638": "REU", "642": "ROU",
+    "643": "RUS", "646": "RWA", "652": "BLM", "654": "SHN", "659": "KNA", "660": "AIA", "662": "LCA", "663": "MAF",
+    "666": "SPM", "670": "VCT", "674": "SMR", "678": "STP", "682": "SAU", "686": "SEN", "688": "SRB", "690": "SYC",
+    "694": "SLE", "702": "SGP", "703": "SVK", "704": "VNM", "705": "SVN", "706": "SOM", "710": "ZAF", "716": "ZWE",
+    "724": "ESP", "728": "SSD", "729": "SDN", "732": "ESH", "740": "SUR", "744": "SJM", "748": "SWZ", "752": "SWE",
+    "756": "CHE", "760": "SYR", "762": "TJK", "764": "THA", "768": "TGO", "772": "TKL", "776": "TON", "780": "TTO",
+    "784": "ARE", "788": "TUN", "792": "TUR", "795": "TKM", "796": "TCA", "798": "TUV", "800": "UGA", "804": "UKR",
+    "807": "MKD", "818": "EGY", "826": "GBR", "831": "GGY", "832": "JEY", "833": "IMN", "834": "TZA", "840": "USA",
+    "850": "VIR", "854": "BFA", "858": "URY", "860": "UZB", "862": "VEN", "876": "WLF", "882": "WSM", "887": "YEM",
+    "894": "ZMB",
+}
+
+
+class CountryIndex:
+    """Grid-cell prefilter plus exact even-odd point-in-polygon tests."""
+
+    def __init__(self, names: list[str], codes: list[str], rings: list[list[np.ndarray]], cell_deg: float = CELL_DEG):
+        self.names = names
+        self.codes = codes
+        self.cell_deg = cell_deg
+        self.nx = int(round(360 / cell_deg))
+        self.ny = int(round(180 / cell_deg))
+
+        x0, y0, x1, y1, country = [], [], [], [], []
+        for index, country_rings in enumerate(rings):
+            for ring in country_rings:
+                if len(ring) < 3:
+                    continue
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                x0.append(ring[:-1, 0])
+                y0.append(ring[:-1, 1])
+                x1.append(ring[1:, 0])
+                y1.append(ring[1:, 1])
+                country.append(np.full(len(ring) - 1, index))
+        x0, y0, x1, y1 = (np.concatenate(a) for a in (x0, y0, x1, y1))
+        country = np.concatenate(country)
+
+        # Every edge marks the cells it touches as border, including the
+        # horizontal ones: a cell crossed only by one is not uniformly owned
+        border = np.zeros((self.ny, self.nx), dtype=bool)
+        for r0, r1, c0, c1 in zip(
+            self._row(np.minimum(y0, y1)), self._row(np.maximum(y0, y1)),
+            self._col(np.minimum(x0, x1)), self._col(np.maximum(x0, x1)),
+        ):
+            border[r0:r1 + 1, c0:c1 + 1] = True
+
+        # The ray test skips horizontal edges (they never cross a horizontal
+        # ray) and edges longer than 180 degrees (antimeridian seams)
+        keep = (y0 != y1) & (np.abs(x1 - x0) <= 180)
+        x0, y0, x1, y1, country = x0[keep], y0[keep], x1[keep], y1[keep], country[keep]
+        rows_lo = self._row(np.minimum(y0, y1))
+        rows_hi = self._row(np.maximum(y0, y1))
+
+        # Per latitude row: the edges overlapping it, grouped by country
+        self._rows = []
+        order = np.argsort(country, kind="stable")
+        for row in range(self.ny):
+            sel = order[(rows_lo[order] <= row) & (rows_hi[order] >= row)]
+            starts = np.flatnonzero(np.r_[True, np.diff(country[sel]) != 0]) if len(sel) else np.zeros(0, np.intp)
+            self._rows.append((
+                x0[sel], y0[sel], y1[sel], (x1[sel] - x0[sel]) / (y1[sel] - y0[sel]),
+                starts, country[sel][starts] if len(sel) else np.zeros(0, np.intp),
+            ))
+
+        # Interior cells take the country of their centre
+        owner = np.full((self.ny, self.nx), BORDER, dtype=np.int32)
+        rows, cols = np.nonzero(~border)
+        centre_lon = (cols + 0.5) * cell_deg - 180
+        centre_lat = (rows + 0.5) * cell_deg - 90
+        owner[rows, cols] = self._exact(centre_lon, centre_lat, rows)
+        self.owner = owner.reshape(-1)
+
+    @classmethod
+    def from_topology(cls, topo: dict, cell_deg: float = CELL_DEG) -> CountryIndex:
+        arcs = decode_arcs(topo)
+        names, codes, rings = [], [], []
+        for geometry in topo["objects"][OBJECT_NAME]["geometries"]:
+            country_rings = [
+                np.concatenate([arcs[r] if r >= 0 else arcs[~r][::-1] for r in ring])
+                for ring in _rings(geometry)
+            ]
+            if not country_rings:
+                continue
+            names.append(geometry.get("properties", {}).get("name", str(geometry.get("id", ""))))
+            codes.append(str(geometry.get("id", "")))
+            rings.append(country_rings)
+        return cls(names, codes, rings, cell_deg)
+
+    @property
+    def border_fraction(self) -> float:
+        return float(np.mean(self.owner == BORDER))
+
+    def _row(self, lat: np.ndarray) -> np.ndarray:
+        return np.clip(np.floor((lat + 90) / self.cell_deg).astype(np.intp), 0, self.ny - 1)
+
+    def _col(self, lon: np.ndarray) -> np.ndarray:
+        return np.clip(np.floor((lon + 180) / self.cell_deg).astype(np.intp), 0, self.nx - 1)
+
+    def _exact(self, lon: np.ndarray, lat: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Country index (or -1) of each point by ray casting against its row's edges."""
+        result = np.full(len(lon), -1, dtype=np.int32)
+        if not len(lon):
+            return result
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        bounds = np.flatnonzero(np.r_[True, np.diff(sorted_rows) != 0, True])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            x0, y0, y1, slope, starts, countries = self._rows[sorted_rows[start]]
+            if not len(x0):
+                continue
+            step = max(1, MAX_CELLS_PER_TEST // len(x0))
+            for lo in range(start, end, step):
+                idx = order[lo:min(lo + step, end)]
+                px = lon[idx, None]
+                py = lat[idx, None]
+                crosses = ((y0 > py) != (y1 > py)) & (px < x0 + (py - y0) * slope)
+                parity = np.bitwise_xor.reduceat(crosses.view(np.uint8), starts, axis=1)
+                inside = parity.astype(bool)
+                result[idx] = np.where(inside.any(axis=1), countries[inside.argmax(axis=1)], -1)
+        return result
+
+    def lookup(self, lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, int]:
+        """Country index per point (-1 when outside every polygon) and how many needed an exact test."""
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        valid = np.isfinite(lon) & np.isfinite(lat) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+        rows = self._row(np.where(valid, lat, 0))
+        cols = self._col(np.where(valid, lon, 0))
+        result = self.owner[rows * self.nx + cols].copy()
+        exact = np.flatnonzero(valid & (result == BORDER))
+        result[exact] = self._exact(lon[exact], lat[exact], rows[exact])
+        result[~valid] = -1
+        return result, len(exact)
+
+
+_INDEX: CountryIndex | None = None
+
+
+def _init_worker(index: CountryIndex) -> None:
+    global _INDEX
+    _INDEX = index
+
+
+def _count_chunk(task: tuple[np.ndarray, np.ndarray, np.ndarray, int]) -> tuple[np.ndarray, np.ndarray, int, int]:
+    """(years, counts per year and country, exact tests, undated rows) for one chunk.
+
+    ``years`` are the distinct years in the chunk; country column 0 is 'unassigned'.
+    """
+    year, lon, lat, undated = task
+    countries, exact = _INDEX.lookup(lon, lat)
+    width = len(_INDEX.names) + 1
+    years, year_idx = np.unique(year, return_inverse=True)
+    flat = year_idx.astype(np.intp) * width + countries + 1
+    return years, np.bincount(flat, minlength=len(years) * width).reshape(len(years), width), exact, undated
+
+
+def _count_byte_range(task: tuple[Path, list[str], int, int]) -> tuple[np.ndarray, np.ndarray, int, int]:
+    path, fieldnames, start, end = task
+    with path.open("rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=fieldnames, usecols=COLUMNS, dtype={"acq_date": str})
+    return _count_chunk(_chunk_task(chunk))
+
+
+def _chunk_task(chunk: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    years = pd.to_datetime(chunk["acq_date"], format="%Y-%m-%d", errors="coerce").dt.year
+    ok = years.notna().to_numpy()
+    lon = pd.to_numeric(chunk["longitude"], errors="coerce").to_numpy(dtype=np.float64)[ok]
+    lat = pd.to_numeric(chunk["latitude"], errors="coerce").to_numpy(dtype=np.float64)[ok]
+    return years.to_numpy()[ok].astype(np.int16), lon, lat, int((~ok).sum())
+
+
+def count_by_country(index: CountryIndex, input_dir: Path = INPUT_DIR,
+                     workers: int = WORKERS) -> tuple[list[int], np.ndarray]:
+    """Years seen in ``acq_date`` and a (year, country + 1) count matrix for them."""
+    width = len(index.names) + 1
+    by_year: dict[int, np.ndarray] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index,)) as pool:
+        for path in list_archives(input_dir):
+            start = time.perf_counter()
+            rows = exact = undated = 0
+            if archive_format(path) == "csv":
+                # Workers parse their own byte ranges, so parsing scales with cores too
+                parts = max(workers, path.stat().st_size // RANGE_BYTES)
+                fieldnames, ranges = split_byte_ranges(path, parts)
+                results = pool.map(_count_byte_range, [(path, fieldnames, lo, hi) for lo, hi in ranges])
+            else:
+                results = _count_stream(pool, path, workers)
+            for years, counts, n_exact, n_undated in results:
+                for year, row in zip(years.tolist(), counts):
+                    by_year.setdefault(year, np.zeros(width, dtype=np.int64))
+                    by_year[year] += row
+                rows += int(counts.sum())
+                exact += n_exact
+                undated += n_undated
+            seconds = time.perf_counter() - start
+            skipped = f", {undated} without a valid acq_date skipped" if undated else ""
+            print(f"[ok] {path.name}: {rows} detections{skipped} in {seconds:.1f}s "
+                  f"({rows / max(seconds, 1e-9) / 1e6:.2f} M rows/s, {exact / max(rows, 1):.1%} exact tests)")
+    years = sorted(by_year)
+    totals = np.array([by_year[year] for year in years], dtype=np.int64).reshape(len(years), width)
+    return years, totals
+
+
+def _count_stream(pool: ProcessPoolExecutor, path: Path, workers: int):
+    """Parse a compressed archive here and geocode its chunks in the pool."""
+    pending = set()
+    with open_fire_archive(path) as f:
+        for chunk in pd.read_csv(f, chunksize=CHUNK_ROWS, usecols=COLUMNS, dtype={"acq_date": str}):
+            pending.add(pool.submit(_count_chunk, _chunk_task(chunk)))
+            # Bound the number of chunks held in memory
+            while len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    for future in pending:
+        yield future.result()
+
+
+def iso3(code: str) -> str:
+    """Alpha-3 code for a world-atlas id; empty for features without one (e.g. Kosovo)."""
+    return ISO3_BY_NUMERIC.get(code.zfill(3), "") if code.isdigit() else ""
+
+
+def to_frame(index: CountryIndex, years: list[int], totals: np.ndarray) -> pd.DataFrame:
+    regions = pd.read_csv(REGION_CSV).set_index("Country")["Region"].to_dict()
+    names = [UNASSIGNED] + [NAME_ALIASES.get(name, name) for name in index.names]
+    codes = [""] + [iso3(code) for code in index.codes]
+    rows, countries = np.nonzero(totals)
+    frame = pd.DataFrame({
+        "year": np.asarray(years, dtype=np.int64)[rows],
+        "country": np.asarray(names, dtype=object)[countries],
+        "iso3": np.asarray(codes, dtype=object)[countries],
+        "count": totals[rows, countries],
+    })
+    frame.insert(3, "region", frame["country"].map(regions).fillna(""))
+    return frame.sort_values(["year", "count"], ascending=[True, False]).reset_index(drop=True)
+
+
+def benchmark(num_points: int = 2_000_000) -> None:
+    start = time.perf_counter()
+    index = CountryIndex.from_topology(fetch_source())
+    print(f"index: {len(index.names)} countries, {index.border_fraction:.1%} border cells, "
+          f"built in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(401)
+    lon = rng.uniform(-180, 180, num_points)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, num_points)))
+    start = time.perf_counter()
+    countries, exact = index.lookup(lon, lat)
+    seconds = time.perf_counter() - start
+    print(f"{num_points:,} points in {seconds:.2f}s ({num_points / seconds / 1e6:.2f} M points/s per core), "
+          f"{exact / num_points:.1%} needed an exact test, {np.mean(countries >= 0):.1%} on land")
+
+    check = slice(0, min(num_points, 20_000))
+    brute = index._exact(lon[check], lat[check], index._row(lat[check]))
+    mismatches = int(np.sum(brute != countries[check]))
+    print(f"grid prefilter vs exact test on {len(brute):,} points: {mismatches} mismatches")
+
+
+def main() -> None:
+    if len(sys.argv) >= 2 and sys.argv[1] == "--benchmark":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000)
+        return
+    index = CountryIndex.from_topology(fetch_source())
+    frame = to_frame(index, *count_by_country(index))
+    frame.to_csv(OUTPUT_CSV, index=False)
+    unassigned = frame.loc[frame["country"] == UNASSIGNED, "count"].sum()
+    print(f"[ok] wrote {OUTPUT_CSV}: {len(frame)} rows, {unassigned / max(frame['count'].sum(), 1):.1%} unassigned")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Near-duplicate tweet clustering with shingled MinHash and LSH banding.
+
+Retweets, quote tweets and templated bot posts (e.g. the daily "Drought
+Center" updates) differ only in a URL, a number or a prefix. Each tweet is
+reduced to a MinHash signature over word shingles; tweets sharing any LSH
+band land in the same bucket, and every pair of bucket members whose shingle
+Jaccard similarity passes the threshold is merged. Signatures are computed
+in chunks and only their band hashes are kept, so memory is 8 bytes per band
+per tweet rather than per permutation. Work is linear in the number of
+tweets plus the candidate pairs.
+
+Scoring one representative per near-duplicate cluster is an approximation:
+the other members take the representative's words and sentiment. Use
+``collapse_exact_duplicates`` when outputs must equal scoring every tweet.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+
+import numpy as np
+
+
+SHINGLE_SIZE = 3
+NUM_BANDS = 16
+ROWS_PER_BAND = 8
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+DEFAULT_THRESHOLD = 0.8
+SEED = 401
+CHUNK_TEXTS = 50_000
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_EMPTY_HASH = np.uint64(0)
+
+
+def normalize_text(text) -> list[str]:
+    """Lowercased word tokens with URLs, mentions and digits removed."""
+    if not isinstance(text, str):
+        return []
+    text = text.lower()
+    text = re.sub(r'https?://\S+|www\.\S+', ' ', text)
+    text = re.sub(r'@\w+', ' ', text)
+    return re.findall(r'[^\W\d_]+', text)
+
+
+def shingles(tokens: list[str], size: int = SHINGLE_SIZE) -> set[str]:
+    if len(tokens) < size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    """Universal-hash MinHash: h_i(x) = (a_i * x + b_i) mod (2^31 - 1)."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_set: set[str]) -> np.ndarray:
+        if not shingle_set:
+            return np.full(self.num_perm, _EMPTY_HASH, dtype=np.uint64)
+        x = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingle_set),
+            dtype=np.uint64,
+            count=len(shingle_set),
+        ) % _MERSENNE_PRIME
+        hashed = (self.a[:, None] * x[None, :] + self.b[:, None]) % _MERSENNE_PRIME
+        return hashed.min(axis=1)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Keep the earliest tweet as the cluster representative
+            if ri < rj:
+                self.parent[rj] = ri
+            else:
+                self.parent[ri] = rj
+
+
+def _band_hashes(signatures: np.ndarray, num_bands: int, rows_per_band: int) -> np.ndarray:
+    """One uint64 per band: a multiply-add hash of the band's rows (wraps mod 2^64)."""
+    weights = MinHasher(rows_per_band, seed=SEED + 1).a | np.uint64(1)
+    bands = signatures.reshape(len(signatures), num_bands, rows_per_band)
+    with np.errstate(over='ignore'):
+        return (bands * weights).sum(axis=2, dtype=np.uint64)
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _groups(keys: np.ndarray, members: np.ndarray):
+    """``members`` grouped by equal ``keys``, groups of one left out."""
+    order = members[np.argsort(keys[members], kind='stable')]
+    sorted_keys = keys[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1], True])
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi - lo > 1:
+            yield order[lo:hi]
+
+
+def cluster_near_duplicates(texts, threshold: float = DEFAULT_THRESHOLD,
+                            num_bands: int = NUM_BANDS, rows_per_band: int = ROWS_PER_BAND) -> np.ndarray:
+    """
+    Assign each text a cluster id (the index of its representative text).
+
+    Clusters are connected components of the candidate pairs whose shingle
+    Jaccard similarity is at least ``threshold``. Texts that normalize to
+    nothing are never merged.
+    """
+    hasher = MinHasher(num_bands * rows_per_band)
+    n = len(texts)
+    band_hashes = np.empty((n, num_bands), dtype=np.uint64)
+    has_tokens = np.zeros(n, dtype=bool)
+    for start in range(0, n, CHUNK_TEXTS):
+        shingle_sets = [shingles(normalize_text(t)) for t in texts[start:start + CHUNK_TEXTS]]
+        signatures = np.stack([hasher.signature(s) for s in shingle_sets])
+        band_hashes[start:start + len(shingle_sets)] = _band_hashes(signatures, num_bands, rows_per_band)
+        has_tokens[start:start + len(shingle_sets)] = [bool(s) for s in shingle_sets]
+
+    uf = _UnionFind(n)
+    candidates = np.flatnonzero(has_tokens)
+
+    # Texts with the same signature (retweets, copies) have an estimated
+    # Jaccard similarity of 1: merge them up front and put only the first of
+    # each in the band buckets
+    signature_hashes = _band_hashes(band_hashes, 1, num_bands)[:, 0]
+    for group in _groups(signature_hashes, candidates):
+        for i in group[1:]:
+            uf.union(int(group[0]), int(i))
+    candidates = candidates[[uf.find(int(i)) == i for i in candidates]]
+
+    for band in range(num_bands):
+        for bucket in _groups(band_hashes[:, band], candidates):
+            bucket = sorted(int(i) for i in bucket)
+            shingle_sets = {i: shingles(normalize_text(texts[i])) for i in bucket}
+            for a, i in enumerate(bucket):
+                for j in bucket[:a]:
+                    # A band collision is only a candidate; confirm on the shingles
+                    if uf.find(i) != uf.find(j) and _jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                        uf.union(i, j)
+
+    return np.array([uf.find(i) for i in range(n)], dtype=np.int64)
+
+
+def collapse_near_duplicates(texts, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Return (representative_indices, cluster_sizes, labels) for the texts.
+
+    Downstream scoring can run once per representative and weight results
+    by cluster size. Members only approximately share their representative's
+    words and sentiment, so totals differ from scoring every tweet.
+    ``labels[i]`` is the representative index of text ``i``.
+    """
+    labels = cluster_near_duplicates(texts, threshold)
+    representatives, sizes = np.unique(labels, return_counts=True)
+    return representatives, sizes, labels
+
+
+def collapse_exact_duplicates(texts):
+    """
+    Like ``collapse_near_duplicates`` but only merges texts that are identical
+    after collapsing whitespace runs. Tokenizing and VADER both split on
+    whitespace, so weighted totals equal scoring every tweet.
+    """
+    first_seen = {}
+    labels = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        key = ' '.join(text.split()) if isinstance(text, str) else (None, i)
+        labels[i] = first_seen.setdefault(key, i)
+    representatives, sizes = np.unique(labels, return_counts=True)
+    return representatives, sizes, labels
@@ -6,8 +6,8 @@ Filters for ONLY wildfire-related words, excluding other disasters and general t
 
 import pandas as pd
 import re
-from collections import Counter
 import json
+from pathlib import Path
 
 # Download required NLTK data
 import nltk
@@ -27,9 +27,32 @@ except LookupError:
 from nltk.corpus import stopwords
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
-# Configuration
-INPUT_FILE = "../website/data/DisasterTweets.csv"
-OUTPUT_FILE = "../website/data/wildfire_wordcloud_data.csv"
+from near_duplicates import collapse_exact_duplicates, collapse_near_duplicates
+from vocabulary import TermCounts, Vocabulary, ngrams
+from word_trends import WindowedWordTrends
+
+# Configuration (paths are relative to the repository root, so the script
+# can be run from any working directory)
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INPUT_FILE = REPO_ROOT / "data" / "DisasterTweets.csv"
+OUTPUT_FILE = REPO_ROOT / "data" / "wildfire_wordcloud_data.csv"
+
+# Collapse duplicate tweets before scoring; each cluster is scored once and
+# weighted by its size. 'near' also merges retweets / templated posts
+# (MinHash/LSH), which approximates the per-tweet result; 'exact' only merges
+# identical text and keeps outputs exact; None scores every tweet.
+COLLAPSE_DUPLICATES = 'near'
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# Count bigrams/trigrams too, so multi-word keywords like "camp fire" match
+MAX_NGRAM = 3
+
+# Windowed word trends from the tweet Timestamp, for animating the word cloud
+# (bucket: 'day' or 'hour'; window counted in buckets)
+TRENDS_FILE = REPO_ROOT / "data" / "wildfire_word_trends.json"
+TREND_BUCKET = 'day'
+TREND_WINDOW = 7
+TREND_TOP_K = 50
 
 # Wildfire DIRECT keywords - ONLY these will be included
 WILDFIRE_KEYWORDS = [
@@ -54,6 +77,8 @@ WILDFIRE_KEYWORDS = [
     'acre', 'acres', 'acreage', 'square miles', 'squaremile',
 ]
 
+WILDFIRE_KEYWORD_SET = {keyword.lower() for keyword in WILDFIRE_KEYWORDS}
+
 # Words to EXCLUDE - not directly wildfire-related
 EXCLUDE_KEYWORDS = {
     # Other disasters
@@ -93,8 +118,12 @@ CUSTOM_STOPWORDS = {
 }
 ALL_STOPWORDS = STOPWORDS | CUSTOM_STOPWORDS
 
-def clean_tweet(text):
-    """Clean and tokenize tweet text"""
+def is_stopword(word):
+    """Stopwords and words of two letters or fewer"""
+    return len(word) <= 2 or word in ALL_STOPWORDS
+
+def tokenize_tweet(text):
+    """Lowercased word tokens of a tweet, stopwords included (for n-grams)"""
     if pd.isna(text):
         return []
     
@@ -114,12 +143,11 @@ def clean_tweet(text):
     text = re.sub(r'\d+', '', text)
     
     # Tokenize
-    words = text.split()
-    
-    # Filter
-    words = [w for w in words if len(w) > 2 and w not in ALL_STOPWORDS]
-    
-    return words
+    return text.split()
+
+def clean_tweet(text):
+    """Clean and tokenize tweet text"""
+    return [w for w in tokenize_tweet(text) if not is_stopword(w)]
 
 def is_wildfire_specific(word):
     """Check if word is directly wildfire-related (not general disaster/climate)"""
@@ -130,11 +158,7 @@ def is_wildfire_specific(word):
         return False
     
     # Check if in wildfire keywords
-    for keyword in WILDFIRE_KEYWORDS:
-        if keyword.lower() == word_lower:
-            return True
-    
-    return False
+    return word_lower in WILDFIRE_KEYWORD_SET
 
 def is_wildfire_tweet(text):
     """Check if tweet is related to wildfires"""
@@ -150,13 +174,17 @@ def is_wildfire_tweet(text):
     
     return False
 
+_ANALYZER = None
+
 def get_sentiment(text):
     """Get sentiment score using VADER"""
+    global _ANALYZER
     if pd.isna(text):
         return 0
     
-    analyzer = SentimentIntensityAnalyzer()
-    scores = analyzer.polarity_scores(str(text))
+    if _ANALYZER is None:
+        _ANALYZER = SentimentIntensityAnalyzer()
+    scores = _ANALYZER.polarity_scores(str(text))
     
     # compound score: -1 (negative) to 1 (positive)
     compound = scores['compound']
@@ -168,6 +196,91 @@ def get_sentiment(text):
     else:
         return 0  # Neutral
 
+# Pipeline stages; main() runs them in order and prints progress, and
+# synthetic_tweets.py times the same functions on generated corpora
+
+def load_tweets(path=INPUT_FILE):
+    """Read the DisasterTweets CSV"""
+    return pd.read_csv(path)
+
+def filter_wildfire_tweets(df):
+    """Tweets labelled Wildfire or mentioning a wildfire keyword, one per Tweet ID
+
+    Adds an ``is_wildfire`` column (keyword match) to ``df``.
+    """
+    df['is_wildfire'] = df['Tweets'].apply(is_wildfire_tweet)
+    wildfire_df = df[(df['Disaster'] == 'Wildfire') | (df['is_wildfire'] == True)]
+    return wildfire_df.drop_duplicates(subset=['Tweet ID'])
+
+def collapse_tweets(tweets, mode=COLLAPSE_DUPLICATES):
+    """(representatives, cluster sizes, per-tweet cluster labels) for a COLLAPSE_DUPLICATES mode"""
+    if mode == 'near':
+        return collapse_near_duplicates(tweets, NEAR_DUPLICATE_THRESHOLD)
+    if mode == 'exact':
+        return collapse_exact_duplicates(tweets)
+    return range(len(tweets)), [1] * len(tweets), list(range(len(tweets)))
+
+def score_terms(tweets, representatives):
+    """representative -> (wildfire terms, excluded words)
+
+    STRICT filtering: ONLY wildfire-specific words and phrases are kept, with
+    phrases built from adjacent words before stopword removal.
+    """
+    scored = {}
+    for rep in representatives:
+        tokens = tokenize_tweet(tweets[rep])
+        terms = [t for t in ngrams(tokens, MAX_NGRAM, is_stopword) if is_wildfire_specific(t)]
+        excluded = [w for w in tokens if not is_stopword(w) and not is_wildfire_specific(w)]
+        scored[rep] = (terms, excluded)
+    return scored
+
+def score_sentiment(tweets, representatives):
+    """representative -> VADER sentiment (-1, 0, 1)"""
+    return {rep: get_sentiment(tweets[rep]) for rep in representatives}
+
+def count_terms(representatives, cluster_sizes, terms, sentiments):
+    """(wildfire term counts, excluded word counts), each tweet weighted by its cluster size"""
+    vocab = Vocabulary()
+    word_counts = TermCounts(vocab)
+    excluded_words = TermCounts(vocab)
+    for rep, weight in zip(representatives, cluster_sizes):
+        wildfire_terms, excluded = terms[rep]
+        word_counts.add_terms(wildfire_terms, sentiments[rep], int(weight))
+        excluded_words.add_terms(excluded, sentiments[rep], int(weight))
+    return word_counts, excluded_words
+
+def build_trends(wildfire_df, labels, terms, sentiments):
+    """Windowed trends: every tweet contributes at its own timestamp, reusing
+    the terms and sentiment scored for its cluster representative"""
+    trends = WindowedWordTrends(bucket=TREND_BUCKET, window=TREND_WINDOW, top_k=TREND_TOP_K)
+    timestamps = pd.to_datetime(wildfire_df['Timestamp'], errors='coerce', utc=True)
+    for ts, label in zip(timestamps, labels):
+        if pd.isna(ts):
+            continue
+        trends.add(ts.to_pydatetime(), terms[label][0], sentiments[label])
+    return trends
+
+def word_cloud_rows(word_counts, top=150):
+    """Word, Frequency and dominant Sentiment of the ``top`` wildfire-specific words"""
+    output_data = []
+    for word, count in word_counts.most_common(top):
+        sents = word_counts.sentiment_tallies(word)
+        
+        # Determine dominant sentiment
+        if sents['positive'] > sents['negative']:
+            sentiment = 1
+        elif sents['negative'] > sents['positive']:
+            sentiment = -1
+        else:
+            sentiment = 0
+        
+        output_data.append({
+            'Word': word,
+            'Frequency': count,
+            'Sentiment': sentiment
+        })
+    return pd.DataFrame(output_data)
+
 def main():
     print("=" * 60)
     print("Processing Wildfire-Specific Word Cloud Data")
@@ -175,7 +288,7 @@ def main():
     
     # Load data
     print("\n📂 Loading data from:", INPUT_FILE)
-    df = pd.read_csv(INPUT_FILE)
+    df = load_tweets()
     print(f"   Total tweets loaded: {len(df)}")
     
     # Show disaster types distribution
@@ -184,21 +297,12 @@ def main():
     for disaster, count in disaster_counts.items():
         print(f"   {disaster}: {count}")
     
-    # Filter for wildfire-related tweets
+    # Filter for wildfire-related tweets: Disaster type = Wildfire, plus
+    # tweets mentioning wildfire keywords
     print("\n🔥 Filtering for wildfire-related tweets...")
-    
-    # Method 1: Filter by Disaster type = Wildfire
-    wildfire_by_type = df[df['Disaster'] == 'Wildfire']
-    print(f"   Tweets with Disaster='Wildfire': {len(wildfire_by_type)}")
-    
-    # Method 2: Also include tweets mentioning wildfire keywords
-    df['is_wildfire'] = df['Tweets'].apply(is_wildfire_tweet)
-    wildfire_by_keyword = df[df['is_wildfire']]
-    print(f"   Tweets mentioning wildfire keywords: {len(wildfire_by_keyword)}")
-    
-    # Combine both methods (union)
-    wildfire_df = df[(df['Disaster'] == 'Wildfire') | (df['is_wildfire'] == True)]
-    wildfire_df = wildfire_df.drop_duplicates(subset=['Tweet ID'])
+    wildfire_df = filter_wildfire_tweets(df)
+    print(f"   Tweets with Disaster='Wildfire': {(df['Disaster'] == 'Wildfire').sum()}")
+    print(f"   Tweets mentioning wildfire keywords: {df['is_wildfire'].sum()}")
     print(f"   Total unique wildfire tweets: {len(wildfire_df)}")
     
     if len(wildfire_df) == 0:
@@ -206,57 +310,33 @@ def main():
         wildfire_df = df
         print(f"   Using {len(wildfire_df)} disaster tweets instead")
     
+    # Collapse near-duplicate tweets (retweets, bot templates)
+    tweets = wildfire_df['Tweets'].tolist()
+    if COLLAPSE_DUPLICATES == 'near':
+        print("\n🧬 Collapsing near-duplicate tweets (MinHash/LSH)...")
+        representatives, cluster_sizes, labels = collapse_tweets(tweets)
+        print(f"   {len(tweets)} tweets -> {len(representatives)} clusters to score")
+    elif COLLAPSE_DUPLICATES == 'exact':
+        print("\n🧬 Collapsing identical tweets...")
+        representatives, cluster_sizes, labels = collapse_tweets(tweets)
+        print(f"   {len(tweets)} tweets -> {len(representatives)} distinct texts to score")
+    else:
+        representatives, cluster_sizes, labels = collapse_tweets(tweets)
+    
     # Process tweets - STRICT WILDFIRE FILTERING
     print("\n📝 Processing tweets with STRICT wildfire filtering...")
+    terms = score_terms(tweets, representatives)
+    sentiments = score_sentiment(tweets, representatives)
+    word_counts, excluded_words = count_terms(representatives, cluster_sizes, terms, sentiments)
     
-    word_counts = Counter()
-    word_sentiments = {}
-    excluded_words = Counter()
-    
-    for idx, row in wildfire_df.iterrows():
-        words = clean_tweet(row['Tweets'])
-        sentiment = get_sentiment(row['Tweets'])
-        
-        for word in words:
-            # Apply STRICT filtering - ONLY wildfire-specific words
-            if is_wildfire_specific(word):
-                word_counts[word] += 1
-                # Aggregate sentiment
-                if word not in word_sentiments:
-                    word_sentiments[word] = {'positive': 0, 'neutral': 0, 'negative': 0}
-                if sentiment == 1:
-                    word_sentiments[word]['positive'] += 1
-                elif sentiment == -1:
-                    word_sentiments[word]['negative'] += 1
-                else:
-                    word_sentiments[word]['neutral'] += 1
-            else:
-                excluded_words[word] += 1
+    print(f"\n📈 Building {TREND_WINDOW}-{TREND_BUCKET} word trend windows...")
+    trends = build_trends(wildfire_df, labels, terms, sentiments)
+    trends.save(TRENDS_FILE)
+    print(f"   {len(trends.frames())} frames -> {TRENDS_FILE}")
     
-    # Calculate final sentiment for each word
+    # Calculate final sentiment for each word and save
     print("\n😊 Calculating sentiment for each word...")
-    
-    output_data = []
-    for word, count in word_counts.most_common(150):  # Top 150 wildfire-specific words
-        sents = word_sentiments[word]
-        total = sents['positive'] + sents['neutral'] + sents['negative']
-        
-        # Determine dominant sentiment
-        if sents['positive'] > sents['negative']:
-            sentiment = 1
-        elif sents['negative'] > sents['positive']:
-            sentiment = -1
-        else:
-            sentiment = 0
-        
-        output_data.append({
-            'Word': word,
-            'Frequency': count,
-            'Sentiment': sentiment
-        })
-    
-    # Create DataFrame and save
-    output_df = pd.DataFrame(output_data)
+    output_df = word_cloud_rows(word_counts)  # Top 150 wildfire-specific words
     output_df.to_csv(OUTPUT_FILE, index=False)
     
     # Summary
@@ -264,7 +344,7 @@ def main():
     print("✅ PROCESSING COMPLETE")
     print("=" * 60)
     print(f"\n📁 Output file: {OUTPUT_FILE}")
-    print(f"📊 Total wildfire-specific words: {len(output_data)}")
+    print(f"📊 Total wildfire-specific words: {len(output_df)}")
     
     # Sentiment distribution
     sentiment_dist = output_df['Sentiment'].value_counts()
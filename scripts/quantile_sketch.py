@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Mergeable t-digest quantile sketches for FRP / brightness distributions.
+
+A ``TDigest`` summarises any number of values in a few hundred (mean,
+weight) centroids. Centroids are small near both tails (the arcsine scale
+function), so p1 / p99 stay accurate. Values are added in NumPy batches and
+two digests merge by re-clustering their centroids, which lets byte-range
+workers sketch their own slice of an archive.
+
+``FireValueSketches`` keeps one digest per (fire type, metric) for a year.
+``build_vis2_fire_samples.py`` fills them during the reservoir scan and stores
+them in ``data/preprocessed/vis2/fire_value_sketches.json``. It also writes
+``fire_value_quantiles.csv`` next to ``sample_summary.csv``.
+
+    python3 scripts/quantile_sketch.py --check [num_values]   # accuracy vs exact quantiles
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+COMPRESSION = 200
+FLUSH_EVERY = 1 << 16
+METRICS = ("frp", "brightness")
+QUANTILE_COLUMNS = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+class TDigest:
+    """Merging t-digest with the k1 (arcsine) scale function."""
+
+    def __init__(self, compression: float = COMPRESSION) -> None:
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> int:
+        return int(self.weights.sum())
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Each centroid may span at most one unit of k(q) = d/(2 pi) asin(2q - 1)
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, np.diff(cluster) != 0])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: TDigest) -> TDigest:
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def mean(self) -> float:
+        return float(np.dot(self.means, self.weights) / self.weights.sum()) if self.count else float("nan")
+
+    def _knots(self) -> tuple[np.ndarray, np.ndarray]:
+        """Cumulative weight at each centroid's midpoint, with min / max as end points."""
+        mid = np.cumsum(self.weights) - self.weights / 2
+        return np.r_[0, mid, self.weights.sum()], np.r_[self.min, self.means, self.max]
+
+    def quantile(self, q):
+        if not self.count:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else float("nan")
+        ranks, values = self._knots()
+        result = np.interp(np.asarray(q, dtype=float) * self.weights.sum(), ranks, values)
+        return result if np.ndim(q) else float(result)
+
+    def cdf(self, x):
+        if not self.count:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else float("nan")
+        ranks, values = self._knots()
+        result = np.interp(np.asarray(x, dtype=float), values, ranks) / self.weights.sum()
+        return result if np.ndim(x) else float(result)
+
+    def histogram(self, edges) -> np.ndarray:
+        """Estimated counts between consecutive ``edges``."""
+        return np.diff(self.cdf(np.asarray(edges, dtype=float))) * self.count
+
+    def to_dict(self) -> dict:
+        return {
+            "compression": self.compression,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": [round(float(m), 4) for m in self.means],
+            "weights": [int(w) for w in self.weights],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TDigest:
+        digest = cls(data.get("compression", COMPRESSION))
+        digest.means = np.asarray(data["means"], dtype=float)
+        digest.weights = np.asarray(data["weights"], dtype=float)
+        if digest.count:
+            digest.min, digest.max = float(data["min"]), float(data["max"])
+        return digest
+
+
+def _to_floats(values: list[str]) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float)
+    except ValueError:
+        out = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except ValueError:
+                pass
+        return out
+
+
+class FireValueSketches:
+    """Per fire type FRP / brightness digests, fed row by row and flushed in batches."""
+
+    def __init__(self, compression: float = COMPRESSION) -> None:
+        self.compression = compression
+        self.digests: dict[str, dict[str, TDigest]] = {}
+        self._pending: dict[str, dict[str, list[str]]] = {}
+        self._pending_rows = 0
+
+    def _digest(self, fire_type: str, metric: str) -> TDigest:
+        by_metric = self.digests.setdefault(fire_type, {})
+        if metric not in by_metric:
+            by_metric[metric] = TDigest(self.compression)
+        return by_metric[metric]
+
+    def add(self, fire_type: str, frp: str, brightness: str) -> None:
+        pending = self._pending.get(fire_type)
+        if pending is None:
+            pending = self._pending[fire_type] = {metric: [] for metric in METRICS}
+        pending["frp"].append(frp)
+        pending["brightness"].append(brightness)
+        self._pending_rows += 1
+        if self._pending_rows >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> FireValueSketches:
+        for fire_type, by_metric in self._pending.items():
+            for metric, values in by_metric.items():
+                if values:
+                    self._digest(fire_type, metric).update(_to_floats(values))
+        self._pending = {}
+        self._pending_rows = 0
+        return self
+
+    def merge(self, other: FireValueSketches) -> FireValueSketches:
+        self.flush()
+        other.flush()
+        for fire_type, by_metric in other.digests.items():
+            for metric, digest in by_metric.items():
+                self._digest(fire_type, metric).merge(digest)
+        return self
+
+    def to_dict(self) -> dict:
+        self.flush()
+        return {
+            fire_type: {metric: digest.to_dict() for metric, digest in sorted(by_metric.items())}
+            for fire_type, by_metric in sorted(self.digests.items())
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, compression: float = COMPRESSION) -> FireValueSketches:
+        sketches = cls(compression)
+        for fire_type, by_metric in data.items():
+            for metric, digest in by_metric.items():
+                sketches.digests.setdefault(fire_type, {})[metric] = TDigest.from_dict(digest)
+        return sketches
+
+    def summary_rows(self, year: int) -> list[dict[str, str]]:
+        """One row per (type, metric): count, mean, min, p50, p90, p99, max."""
+        self.flush()
+        rows = []
+        for fire_type, by_metric in sorted(self.digests.items()):
+            for metric, digest in sorted(by_metric.items()):
+                if not digest.count:
+                    continue
+                row = {
+                    "year": str(year),
+                    "type": fire_type,
+                    "metric": metric,
+                    "count": str(digest.count),
+                    "mean": f"{digest.mean():.3f}",
+                    "min": f"{digest.min:.3f}",
+                }
+                row.update({name: f"{digest.quantile(q):.3f}" for name, q in QUANTILE_COLUMNS.items()})
+                row["max"] = f"{digest.max:.3f}"
+                rows.append(row)
+        return rows
+
+
+def load_sketches(path: Path) -> dict[int, FireValueSketches]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    compression = data.get("compression", COMPRESSION)
+    return {int(year): FireValueSketches.from_dict(by_type, compression) for year, by_type in data["years"].items()}
+
+
+def save_sketches(path: Path, sketches: dict[int, FireValueSketches]) -> None:
+    data = {
+        "compression": COMPRESSION,
+        "years": {str(year): sketches[year].to_dict() for year in sorted(sketches)},
+    }
+    path.write_text(json.dumps(data, separators=(",", ":")) + "\n", encoding="utf-8")
+
+
+def check(num_values: int = 2_000_000, parts: int = 8) -> None:
+    """Compare merged per-part digests against exact quantiles of a heavy-tailed sample."""
+    rng = np.random.default_rng(401)
+    values = rng.lognormal(mean=1.2, sigma=1.1, size=num_values)  # FRP-like: many small, long tail
+    merged = TDigest()
+    for part in np.array_split(values, parts):
+        digest = TDigest()
+        for batch in np.array_split(part, max(1, len(part) // FLUSH_EVERY)):
+            digest.update(batch)
+        merged.merge(digest)
+    print(f"{num_values:,} values in {len(merged.means)} centroids, {parts} merged parts")
+    for q in (0.01, 0.5, 0.9, 0.99, 0.999):
+        exact = float(np.quantile(values, q))
+        estimate = merged.quantile(q)
+        rank = float(np.mean(values <= estimate))
+        print(f"  q={q:<6} exact={exact:10.3f}  sketch={estimate:10.3f}  rank error={rank - q:+.5f}")
+
+
+def main() -> None:
+    if len(sys.argv) >= 2 and sys.argv[1] == "--check":
+        check(int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000)
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
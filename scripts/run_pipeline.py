@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""Rebuild the website's data products in dependency order.
+
+Each stage declares its input files, output files and the code it runs.
+A stage is skipped when the content hashes of its inputs and code match the
+last successful run and all of its outputs still exist. Independent stages
+run in parallel; a stage starts once every stage producing one of its
+inputs has finished.
+
+    python3 scripts/run_pipeline.py               # rebuild whatever is stale
+    python3 scripts/run_pipeline.py --dry-run     # show what would rebuild
+    python3 scripts/run_pipeline.py wordcloud     # one stage (plus its upstream)
+    python3 scripts/run_pipeline.py --force       # ignore the cache
+
+Can be run from any working directory; every stage sets its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+DATA_DIR = REPO_ROOT / "data"
+CACHE_PATH = REPO_ROOT / ".pipeline_cache.json"
+HASH_CHUNK = 1 << 20
+
+
+@dataclass
+class Stage:
+    """One pipeline step. Paths are repository-relative globs."""
+
+    name: str
+    command: list[str]
+    cwd: Path
+    inputs: list[str]
+    outputs: list[str]
+    code: list[str]
+    version: str = "1"
+    notebook: str | None = None
+    # Remote inputs the command downloads itself; part of the cache key
+    urls: list[str] = field(default_factory=list)
+    upstream: set[str] = field(default_factory=set)
+
+    def input_paths(self) -> list[Path]:
+        return _expand(self.inputs + self.code + ([self.notebook] if self.notebook else []))
+
+    def output_paths(self) -> list[Path]:
+        return _expand(self.outputs)
+
+
+def _python(script: str) -> list[str]:
+    return [sys.executable, str(SCRIPTS_DIR / script)]
+
+
+# fire_archive_* files and DL_FIRE_*.zip bundles; one glob, because every
+# input pattern must match for a stage to run
+ARCHIVES = "data/wild_fire_nasa/*"
+WORLD_ATLAS_URL = "https://cdn.jsdelivr.net/npm/world-atlas@2/countries-110m.json"
+
+STAGES = [
+    Stage(
+        name="vis2_samples",
+        command=_python("build_vis2_fire_samples.py"),
+        cwd=REPO_ROOT,
+        inputs=[ARCHIVES],
+        outputs=[
+            "data/preprocessed/vis2/fire_points_*.csv",
+            "data/preprocessed/vis2/sample_summary.csv",
+            "data/preprocessed/vis2/fire_value_sketches.json",
+            "data/preprocessed/vis2/fire_value_quantiles.csv",
+        ],
+        code=[
+            "scripts/build_vis2_fire_samples.py",
+            "scripts/fire_archive_io.py",
+            "scripts/fire_validation.py",
+            "scripts/quantile_sketch.py",
+        ],
+    ),
+    # Supersedes the counting loop in data/wild_fire.ipynb: same CSV, one scan
+    Stage(
+        name="fire_count_cube",
+        command=_python("build_fire_count_cube.py"),
+        cwd=REPO_ROOT,
+        inputs=[ARCHIVES],
+        outputs=[
+            "data/preprocessed/fire_count_cube.npz",
+            "data/preprocessed/wildfire_count_by_year_type.csv",
+            "data/preprocessed/vis2/fire_count_by_year_month_type.csv",
+        ],
+        code=["scripts/build_fire_count_cube.py", "scripts/fire_archive_io.py"],
+    ),
+    Stage(
+        name="validate_archives",
+        command=_python("fire_validation.py"),
+        cwd=REPO_ROOT,
+        inputs=[ARCHIVES],
+        outputs=["data/preprocessed/quarantine/validation_report.csv"],
+        code=["scripts/fire_validation.py", "scripts/fire_archive_io.py"],
+    ),
+    Stage(
+        name="world_basemap",
+        command=_python("build_world_basemap.py") + ["--download", WORLD_ATLAS_URL],
+        cwd=REPO_ROOT,
+        inputs=[],
+        urls=[WORLD_ATLAS_URL],
+        outputs=[
+            "data/basemap/countries-110m.json",
+            "data/basemap/world-110m.detail.json",
+            "data/basemap/world-110m.coarse.json",
+        ],
+        code=["scripts/build_world_basemap.py"],
+    ),
+    Stage(
+        name="country_fire_counts",
+        command=_python("geocode_fires.py"),
+        cwd=REPO_ROOT,
+        inputs=[ARCHIVES, "data/basemap/countries-110m.json", "data/preprocessed/vis3/country_to_region.csv"],
+        outputs=["data/preprocessed/fire_count_by_country_year.csv"],
+        code=[
+            "scripts/geocode_fires.py",
+            "scripts/build_world_basemap.py",
+            "scripts/fire_archive_io.py",
+        ],
+    ),
+    Stage(
+        name="power_grid",
+        command=_python("build_power_grid.py"),
+        cwd=REPO_ROOT,
+        inputs=["data/weather_temperature_percipitation/POWER_*.csv"],
+        outputs=[
+            "data/preprocessed/global_tem_by_year.csv",
+            "data/preprocessed/global_precip_by_year.csv",
+            "data/preprocessed/power_grid/regional_by_year.csv",
+        ],
+        code=["scripts/build_power_grid.py"],
+    ),
+    Stage(
+        name="global_co2",
+        command=[sys.executable, "-"],
+        cwd=DATA_DIR,
+        notebook="data/co2.ipynb",
+        inputs=["data/co2/owid-co2-data.csv"],
+        outputs=["data/preprocessed/global_co2_by_year.csv"],
+        code=[],
+    ),
+    Stage(
+        name="wordcloud",
+        command=_python("process_wildfire_data.py"),
+        cwd=REPO_ROOT,
+        inputs=["data/DisasterTweets.csv"],
+        outputs=["data/wildfire_wordcloud_data.csv", "data/wildfire_word_trends.json"],
+        code=[
+            "scripts/process_wildfire_data.py",
+            "scripts/near_duplicates.py",
+            "scripts/vocabulary.py",
+            "scripts/word_trends.py",
+        ],
+    ),
+]
+
+
+def _expand(patterns: list[str]) -> list[Path]:
+    paths: set[Path] = set()
+    for pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            # Skip dotfiles such as data/wild_fire_nasa/.gitkeep
+            paths.update(p for p in REPO_ROOT.glob(pattern) if p.is_file() and not p.name.startswith("."))
+        else:
+            path = REPO_ROOT / pattern
+            if path.is_file():
+                paths.add(path)
+    return sorted(paths)
+
+
+def _missing_inputs(stage: Stage) -> list[str]:
+    return [pattern for pattern in stage.inputs if not _expand([pattern])]
+
+
+def _notebook_source(path: Path) -> str:
+    """Concatenate a notebook's code cells into one script."""
+    notebook = json.loads(path.read_text(encoding="utf-8"))
+    cells = ["".join(cell["source"]) for cell in notebook["cells"] if cell["cell_type"] == "code"]
+    return "\n\n".join(cells) + "\n"
+
+
+def _overlaps(outputs: list[str], inputs: list[str]) -> bool:
+    return any(
+        out == inp or fnmatch(inp, out) or fnmatch(out, inp)
+        for out in outputs for inp in inputs
+    )
+
+
+def resolve_dependencies(stages: list[Stage]) -> None:
+    """Link each stage to the stages whose declared outputs it reads."""
+    for stage in stages:
+        stage.upstream = {
+            other.name for other in stages
+            if other is not stage and _overlaps(other.outputs, stage.inputs)
+        }
+
+
+class HashCache:
+    """Content hashes memoised by (size, mtime) so unchanged archives are not re-read."""
+
+    def __init__(self, entries: dict[str, dict]) -> None:
+        self.entries = entries
+        self._lock = threading.Lock()
+
+    def file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.relative_to(REPO_ROOT))
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(block)
+        with self._lock:
+            self.entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+        return digest.hexdigest()
+
+
+def _portable(arg: str) -> str:
+    """Command argument with paths inside the checkout made repository-relative."""
+    path = Path(arg)
+    if path.is_absolute() and path.is_relative_to(REPO_ROOT):
+        return path.relative_to(REPO_ROOT).as_posix()
+    return arg
+
+
+def stage_key(stage: Stage, hashes: HashCache) -> str:
+    digest = hashlib.sha256()
+    command = [_portable(arg) for arg in stage.command[1:]]
+    digest.update(json.dumps([stage.name, stage.version, command, stage.urls]).encode())
+    for path in stage.input_paths():
+        digest.update(str(path.relative_to(REPO_ROOT)).encode())
+        digest.update(hashes.file_hash(path).encode())
+    return digest.hexdigest()
+
+
+def stage_status(stage: Stage, state: dict, hashes: HashCache, force: bool) -> str:
+    """One of: 'missing-inputs', 'up-to-date', 'stale'."""
+    if _missing_inputs(stage):
+        return "missing-inputs"
+    if force:
+        return "stale"
+    record = state.get("stages", {}).get(stage.name)
+    if not record or record.get("key") != stage_key(stage, hashes):
+        return "stale"
+    if any(not _expand([pattern]) for pattern in stage.outputs):
+        return "stale"
+    return "up-to-date"
+
+
+def run_stage(stage: Stage) -> tuple[float, str]:
+    start = time.perf_counter()
+    stdin = _notebook_source(REPO_ROOT / stage.notebook) if stage.notebook else None
+    result = subprocess.run(
+        stage.command, cwd=stage.cwd, input=stdin, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{stage.name} failed ({result.returncode}):\n{result.stdout}{result.stderr}")
+    return time.perf_counter() - start, result.stdout
+
+
+def select(stages: list[Stage], targets: list[str]) -> list[Stage]:
+    """Requested stages plus everything upstream of them."""
+    by_name = {stage.name: stage for stage in stages}
+    unknown = [name for name in targets if name not in by_name]
+    if unknown:
+        raise SystemExit(f"unknown stage(s): {', '.join(unknown)}; known: {', '.join(by_name)}")
+    wanted: set[str] = set()
+    pending = list(targets or by_name)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].upstream)
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def load_state() -> dict:
+    if CACHE_PATH.exists():
+        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    return {"files": {}, "stages": {}}
+
+
+def save_state(state: dict) -> None:
+    CACHE_PATH.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def dry_run(stages: list[Stage], state: dict, hashes: HashCache, force: bool) -> None:
+    rebuilding: set[str] = set()
+    by_name = {stage.name: stage for stage in stages}
+    for stage in _topological(stages):
+        status = stage_status(stage, state, hashes, force)
+        # Inputs a rebuilding upstream stage will write are not missing
+        produced = [out for name in stage.upstream & rebuilding for out in by_name[name].outputs]
+        missing = [pattern for pattern in _missing_inputs(stage) if not _overlaps(produced, [pattern])]
+        if status == "missing-inputs" and not missing:
+            status = "stale (upstream)"
+        if status == "up-to-date" and stage.upstream & rebuilding:
+            status = "stale (upstream)"
+        if status.startswith("stale"):
+            rebuilding.add(stage.name)
+        print(f"[{'rebuild' if status.startswith('stale') else 'skip'}] {stage.name}: {status}")
+        if status == "missing-inputs":
+            print(f"       missing: {', '.join(missing)}")
+        if stage.urls and status.startswith("stale"):
+            print(f"       downloads: {', '.join(stage.urls)}")
+
+
+def _topological(stages: list[Stage]) -> list[Stage]:
+    names = {stage.name for stage in stages}
+    done: set[str] = set()
+    ordered: list[Stage] = []
+    while len(ordered) < len(stages):
+        ready = [s for s in stages if s.name not in done and (s.upstream & names) <= done]
+        if not ready:
+            raise SystemExit("dependency cycle between stages")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+    return ordered
+
+
+def run(stages: list[Stage], state: dict, hashes: HashCache, force: bool, jobs: int) -> bool:
+    names = {stage.name for stage in stages}
+    finished: set[str] = set()
+    failed: set[str] = set()
+    running: dict[Future, Stage] = {}
+    pending = list(_topological(stages))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for stage in list(pending):
+                if stage.upstream & names & failed:
+                    print(f"[skip] {stage.name}: upstream failed")
+                    pending.remove(stage)
+                    failed.add(stage.name)
+                    continue
+                if not (stage.upstream & names) <= finished:
+                    continue
+                pending.remove(stage)
+                status = stage_status(stage, state, hashes, force)
+                if status != "stale":
+                    print(f"[skip] {stage.name}: {status}")
+                    finished.add(stage.name)
+                    continue
+                print(f"[run] {stage.name}")
+                running[pool.submit(run_stage, stage)] = stage
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    seconds, _ = future.result()
+                except RuntimeError as err:
+                    print(f"[fail] {err}")
+                    failed.add(stage.name)
+                    continue
+                state.setdefault("stages", {})[stage.name] = {
+                    "key": stage_key(stage, hashes),
+                    "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "seconds": round(seconds, 2),
+                }
+                save_state(state)
+                finished.add(stage.name)
+                print(f"[ok] {stage.name} in {seconds:.1f}s")
+
+    return not failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild stale data products.")
+    parser.add_argument("stages", nargs="*", help="stages to build (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would rebuild")
+    parser.add_argument("--force", action="store_true", help="rebuild even if inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=2, help="stages to run in parallel")
+    parser.add_argument("--list", action="store_true", help="list stages and their dependencies")
+    args = parser.parse_args()
+
+    resolve_dependencies(STAGES)
+    if args.list:
+        for stage in _topological(STAGES):
+            after = f" (after {', '.join(sorted(stage.upstream))})" if stage.upstream else ""
+            print(f"{stage.name}{after}")
+        return
+
+    stages = select(STAGES, args.stages)
+    state = load_state()
+    hashes = HashCache(state.setdefault("files", {}))
+    if args.dry_run:
+        dry_run(stages, state, hashes, args.force)
+        return
+    ok = run(stages, state, hashes, args.force, max(args.jobs, 1))
+    save_state(state)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,16 +12,21 @@ Twitter Wildfire Sentiment Analysis Scraper
     - 如果无法访问，可以手动创建 sentiment_analysis.csv
 """
 
-import snscrape.modules.twitter as sntwitter
 import pandas as pd
 import re
-from collections import Counter
-from textblob import TextBlob
 import nltk
 from datetime import datetime, timedelta
 import json
 import os
 
+from vocabulary import TermCounts, Vocabulary, ngrams
+
+# 仅爬取时需要 snscrape；情感分析需要 textblob
+try:
+    from textblob import TextBlob
+except ImportError:
+    TextBlob = None
+
 # 下载必要的 NLTK 数据
 try:
     nltk.data.find('tokenizers/punkt')
@@ -60,6 +65,9 @@ WILDFIRE_STOPWORDS = {
 }
 STOPWORDS = STOPWORDS.union(WILDFIRE_STOPWORDS)
 
+# 同时统计双词短语（如 "camp fire"）
+MAX_NGRAM = 2
+
 
 def clean_tweet(tweet_text):
     """
@@ -73,7 +81,7 @@ def clean_tweet(tweet_text):
         return ""
     
     # 移除 URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'https?://\S+|www\.\S+', '', str(tweet_text))
     # 移除 @mentions
     text = re.sub(r'@\w+', '', text)
     # 移除 # 符号但保留标签文字
@@ -88,23 +96,11 @@ def clean_tweet(tweet_text):
     return text
 
 
-def extract_words(text):
+def is_stopword(word):
     """
-    提取有意义的词语
-    - 移除停用词
-    - 只保留长度 > 2 的词
+    停用词或长度 <= 2 的词
     """
-    if not text:
-        return []
-    
-    words = text.split()
-    meaningful_words = [
-        word for word in words 
-        if word not in STOPWORDS 
-        and len(word) > 2
-    ]
-    
-    return meaningful_words
+    return word in STOPWORDS or len(word) <= 2
 
 
 def analyze_sentiment(text):
@@ -145,6 +141,7 @@ def scrape_california_wildfire_tweets(max_tweets=5000):
     """
     爬取加州大火相关推文
     """
+    import snscrape.modules.twitter as sntwitter
     
     print("=" * 60)
     print("🐦 开始爬取加州大火推文...")
@@ -209,8 +206,8 @@ def process_tweets(tweets):
     print("🔍 处理推文数据...")
     print("=" * 60)
     
-    word_counts = Counter()
-    word_sentiments = {}
+    # 词汇表把词映射为整数 ID，词频和情感计数存放在 NumPy 数组中
+    word_counts = TermCounts(Vocabulary())
     tweet_data = []
     
     for i, tweet in enumerate(tweets):
@@ -219,17 +216,12 @@ def process_tweets(tweets):
         
         # 清理推文
         cleaned_text = clean_tweet(tweet['content'])
-        words = extract_words(cleaned_text)
         
         # 分析情感
         sentiment = analyze_sentiment(tweet['content'])
         
-        # 统计词频
-        for word in words:
-            word_counts[word] += 1
-            if word not in word_sentiments:
-                word_sentiments[word] = []
-            word_sentiments[word].append(sentiment)
+        # 统计词频：短语由停用词过滤前相邻的词组成，全是停用词的短语丢弃
+        word_counts.add_terms(ngrams(cleaned_text.split(), MAX_NGRAM, is_stopword), sentiment)
         
         tweet_data.append({
             'date': tweet['date'],
@@ -239,21 +231,32 @@ def process_tweets(tweets):
         })
     
     # 计算每个词的平均情感
-    word_sentiment_avg = {}
-    for word, sentiments in word_sentiments.items():
-        avg = sum(sentiments) / len(sentiments)
-        if avg > 0.1:
-            word_sentiment_avg[word] = 1
-        elif avg < -0.1:
-            word_sentiment_avg[word] = -1
-        else:
-            word_sentiment_avg[word] = 0
+    word_sentiment_avg = WordSentiments(word_counts)
     
     print(f"   提取了 {len(word_counts)} 个不同的词")
     
     return word_counts, word_sentiment_avg, tweet_data
 
 
+class WordSentiments:
+    """
+    每个词的平均情感标签 (1/0/-1)，按需从 TermCounts 数组计算
+    提供与 dict 相同的 get() / values() 接口
+    """
+
+    def __init__(self, word_counts):
+        self.vocab = word_counts.vocab
+        avg = word_counts.mean_sentiment()
+        self.labels = (avg > 0.1).astype('int8') - (avg < -0.1).astype('int8')
+
+    def get(self, word, default=0):
+        term_id = self.vocab.id_of(word)
+        return default if term_id is None else int(self.labels[term_id])
+
+    def values(self):
+        return self.labels.tolist()
+
+
 def generate_sentiment_csv(word_counts, word_sentiments, output_file):
     """
     生成 sentiment_analysis.csv 文件
@@ -332,6 +335,9 @@ def main():
     """
     主函数
     """
+    if TextBlob is None:
+        raise SystemExit("textblob is required: pip install textblob")
+    
     # 配置
     MAX_TWEETS = 3000  # 最大推文数量
     OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Local static server with encoding negotiation and cache headers.
+
+A drop-in replacement for ``python3 -m http.server`` when working on the
+site. It serves the precompressed ``.br``/``.gz`` siblings written by
+``scripts/build_static_assets.py`` to clients that accept them. It sends
+``ETag`` headers and answers ``If-None-Match`` with 304. Content-hashed
+files under ``data/dist/`` are marked ``immutable``; everything else must
+revalidate. When ``data/dist/manifest.json`` exists it is inlined into each
+page that loads ``js/assets.js`` (as ``window.ASSET_MANIFEST``), so the
+pages resolve hashed names without fetching the manifest first.
+
+    python3 scripts/serve_static.py [port]   # serve repository root (default 5500)
+    python3 scripts/serve_static.py --measure
+
+``--measure`` starts the server on a free port, then fetches each page's HTML,
+local scripts and the data it needs for its first render, one request after
+another. It does this twice, cold and with a warm ETag cache. For each page
+it reports the bytes transferred and the total time of those sequential
+fetches, with and without the hashed/precompressed assets. That total is a
+transfer cost over loopback, not a browser's time to first render, which
+fetches in parallel and also parses and draws.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import hashlib
+import http.server
+import io
+import json
+import mimetypes
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from functools import partial
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = REPO_ROOT / "data" / "dist" / "manifest.json"
+DEFAULT_PORT = 5500
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.[^./]+$")
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+ASSETS_SCRIPT = re.compile(r'<script[^>]+src="[^"]*assets\.js"')
+
+# Data each page must fetch before its first render (repository-relative)
+PAGE_DATA = {
+    "website/vis1.html": [
+        "data/preprocessed/wildfire_count_by_year_type.csv",
+        "data/preprocessed/global_co2_by_year.csv",
+        "data/preprocessed/global_precip_by_year.csv",
+        "data/preprocessed/global_tem_by_year.csv",
+    ],
+    "website/vis2.html": [
+        "data/preprocessed/vis2/sample_summary.csv",
+        "data/preprocessed/wildfire_count_by_year_type.csv",
+        "data/preprocessed/vis2/fire_value_quantiles.csv",
+        "data/preprocessed/vis2/fire_points_2012.csv",
+        "data/basemap/world-110m.detail.json",
+        "data/basemap/world-110m.coarse.json",
+    ],
+    "website/vis3.html": [
+        "data/co2/owid-co2-data.csv",
+        "data/preprocessed/vis3/country_to_region.csv",
+    ],
+    "website/vis4.html": [
+        "data/preprocessed/wildfire_count_by_year_type.csv",
+        "data/preprocessed/global_co2_by_year.csv",
+        "data/preprocessed/global_tem_by_year.csv",
+        "data/preprocessed/global_precip_by_year.csv",
+    ],
+}
+
+
+class CachingRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler plus precompressed variants, ETags and Cache-Control."""
+
+    _etags: dict[tuple[str, int, int], str] = {}
+    _etag_lock = threading.Lock()
+
+    def log_message(self, format: str, *args) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+    def _etag(self, path: Path) -> str:
+        stat = path.stat()
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        with self._etag_lock:
+            etag = self._etags.get(key)
+        if etag is None:
+            digest = HASHED_NAME.search(path.name.removesuffix(".gz").removesuffix(".br"))
+            if digest:
+                etag = f'"{digest.group(0).split(".")[1]}-{path.suffix.lstrip(".")}"'
+            else:
+                etag = f'"{hashlib.sha256(path.read_bytes()).hexdigest()[:16]}"'
+            with self._etag_lock:
+                self._etags[key] = etag
+        return etag
+
+    def _negotiate(self, path: Path) -> tuple[Path, str | None]:
+        accepted = {
+            token.split(";")[0].strip().lower()
+            for token in self.headers.get("Accept-Encoding", "").split(",")
+        }
+        for encoding, suffix in ENCODINGS:
+            candidate = path.with_name(path.name + suffix)
+            if encoding in accepted and candidate.is_file():
+                return candidate, encoding
+        return path, None
+
+    def _send_page(self, path: Path, manifest: str):
+        """Serve an HTML page with the asset manifest inlined before ``js/assets.js``."""
+        html = path.read_text(encoding="utf-8")
+        manifest = manifest.strip().replace("</", "<\\/")
+        inline = f"<script>window.ASSET_MANIFEST = {manifest};</script>\n  "
+        match = ASSETS_SCRIPT.search(html)
+        if match:
+            html = html[:match.start()] + inline + html[match.start():]
+        body = html.encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if etag in {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", REVALIDATE)
+            self.end_headers()
+            return None
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", REVALIDATE)
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() or not path.is_file():
+            return super().send_head()
+        if path.suffix == ".html" and getattr(self.server, "inline_manifest", True) and MANIFEST_PATH.exists():
+            return self._send_page(path, MANIFEST_PATH.read_text(encoding="utf-8"))
+
+        body_path, encoding = self._negotiate(path)
+        etag = self._etag(body_path)
+        cache_control = IMMUTABLE if HASHED_NAME.search(path.name) else REVALIDATE
+
+        if etag in {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        f = body_path.open("rb")
+        stat = os.fstat(f.fileno())
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return f
+
+
+def make_server(port: int, quiet: bool = False, inline_manifest: bool = True) -> http.server.ThreadingHTTPServer:
+    handler = partial(CachingRequestHandler, directory=str(REPO_ROOT))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.quiet = quiet
+    server.inline_manifest = inline_manifest
+    return server
+
+
+def _page_scripts(page: str) -> list[str]:
+    """Local <script src> files referenced by a page, repository-relative."""
+    html = (REPO_ROOT / page).read_text(encoding="utf-8")
+    base = (REPO_ROOT / page).parent
+    scripts = []
+    for src in re.findall(r'<script[^>]+src="([^"]+)"', html):
+        if "://" not in src:
+            scripts.append(str((base / src).resolve().relative_to(REPO_ROOT).as_posix()))
+    return scripts
+
+
+def _load_page(base_url: str, urls: list[str], etags: dict[str, str], compressed: bool) -> tuple[int, int, float]:
+    """Fetch ``urls``; returns (bytes transferred, 304 count, seconds)."""
+    transferred = 0
+    not_modified = 0
+    start = time.perf_counter()
+    for url in urls:
+        request = urllib.request.Request(f"{base_url}/{url}")
+        if compressed:
+            request.add_header("Accept-Encoding", "br, gzip")
+        if url in etags:
+            request.add_header("If-None-Match", etags[url])
+        try:
+            with urllib.request.urlopen(request) as response:
+                transferred += len(response.read())
+                etags[url] = response.headers.get("ETag", "")
+        except urllib.error.HTTPError as err:
+            if err.code != 304:
+                raise
+            not_modified += 1
+    return transferred, not_modified, time.perf_counter() - start
+
+
+def measure() -> None:
+    manifest = {}
+    if MANIFEST_PATH.exists():
+        manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))["files"]
+    else:
+        print("[warn] no data/dist/manifest.json; run scripts/build_static_assets.py first")
+
+    # Plain mode is served like a static host without data/dist: no inlined manifest
+    servers = {inline: make_server(0, quiet=True, inline_manifest=inline) for inline in (False, True)}
+    for server in servers.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{'page':<20} {'mode':<22} {'cold bytes':>12} {'cold fetch ms':>14} {'warm bytes':>11} {'304s':>5} "
+          f"{'warm fetch ms':>14}")
+    for page, data in PAGE_DATA.items():
+        data = [path for path in data if (REPO_ROOT / path).exists()]
+        shell = [page] + _page_scripts(page)
+        modes = [("plain", data, False)]
+        if manifest:
+            modes.append(("hashed + br/gzip", [manifest.get(path, path) for path in data], True))
+        for label, data_urls, compressed in modes:
+            base_url = f"http://127.0.0.1:{servers[compressed].server_address[1]}"
+            etags: dict[str, str] = {}
+            cold_bytes, _, cold_s = _load_page(base_url, shell + data_urls, etags, compressed)
+            # A browser would not even revalidate immutable assets; count them as free
+            warm_urls = [url for url in shell + data_urls if not (compressed and HASHED_NAME.search(url))]
+            warm_bytes, revalidated, warm_s = _load_page(base_url, warm_urls, etags, compressed)
+            print(
+                f"{Path(page).name:<20} {label:<22} {cold_bytes:>12,} {cold_s * 1000:>14.1f} "
+                f"{warm_bytes:>11,} {revalidated:>5} {warm_s * 1000:>14.1f}"
+            )
+    for server in servers.values():
+        server.shutdown()
+
+
+def main() -> None:
+    if "--measure" in sys.argv[1:]:
+        measure()
+        return
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = make_server(port)
+    print(f"Serving {REPO_ROOT} at http://127.0.0.1:{port}/website/intro.html")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Synthetic DisasterTweets.csv corpora and a scaling benchmark for the word cloud.
+
+The generator learns from ``data/DisasterTweets.csv``:
+- the disaster mix and per-disaster word frequencies
+- tweet lengths
+- the exact-duplicate rate per disaster
+- how often tweets carry URLs / @mentions, with the URLs and mentions
+  themselves resampled from the seed
+- engagement columns (Comments, Retweets, Likes, Impressions)
+
+It writes corpora of any size with the same columns. Tweet IDs are written
+as unique integers rather than the seed's spreadsheet-rounded ``1.76319E+18``.
+
+The benchmark times each stage function of ``process_wildfire_data.py`` (load,
+filter, dedupe, tokenize, sentiment, aggregate) and ``scrape_wildfire_tweets.
+process_tweets()`` on generated corpora. It reports tweets/s and the
+tracemalloc peak per stage. Memory is traced in a second pass so that
+tracing does not slow the timed one.
+
+    python3 scripts/synthetic_tweets.py 1000000 data/DisasterTweets_1M.csv
+    python3 scripts/synthetic_tweets.py --benchmark [num_tweets ...]
+
+Run from repository root.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import process_wildfire_data as wordcloud
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SEED_PATH = REPO_ROOT / "data" / "DisasterTweets.csv"
+CHUNK_TWEETS = 100_000
+SEED = 401
+BENCHMARK_SIZES = [10_000, 100_000]
+
+COLUMNS = ["Name", "UserName", "Timestamp", "Verified", "Tweets", "Comments", "Retweets", "Likes",
+           "Impressions", "Tags", "Tweet Link", "Tweet ID", "Disaster"]
+ENGAGEMENT_COLUMNS = ["Comments", "Retweets", "Likes", "Impressions"]
+URL = re.compile(r"https?://\S+")
+MENTION = re.compile(r"@\w+")
+HASHTAG = re.compile(r"#\w+")
+
+
+class TweetModel:
+    """Per-disaster statistics of a seed corpus, enough to sample look-alike tweets."""
+
+    def __init__(self, seed: pd.DataFrame):
+        seed = seed.dropna(subset=["Tweets", "Disaster"])
+        texts = seed["Tweets"].astype(str)
+        mix = seed["Disaster"].value_counts()
+        self.disasters = mix.index.tolist()
+        self.mix = (mix / mix.sum()).to_numpy()
+
+        self.words, self.word_p, self.lengths, self.dup_rate = {}, {}, {}, {}
+        for disaster, group in texts.groupby(seed["Disaster"]):
+            tokens = [MENTION.sub("", URL.sub("", text)).split() for text in group]
+            counts = pd.Series([w for words in tokens for w in words]).value_counts()
+            self.words[disaster] = counts.index.to_numpy(dtype=object)
+            self.word_p[disaster] = (counts / counts.sum()).to_numpy()
+            self.lengths[disaster] = np.array([max(len(words), 1) for words in tokens])
+            self.dup_rate[disaster] = float(group.duplicated().mean())
+
+        self.url_rate = float(texts.str.contains(URL).mean())
+        self.mention_rate = float(texts.str.contains(MENTION).mean())
+        self.urls = np.array(texts.str.findall(URL).explode().dropna().tolist() or ["https://t.co/x"], dtype=object)
+        self.mentions = np.array(texts.str.findall(MENTION).explode().dropna().tolist() or ["@user"], dtype=object)
+        self.verified_rate = float(seed["Verified"].astype(str).str.upper().eq("TRUE").mean())
+        self.engagement = seed[ENGAGEMENT_COLUMNS].astype(str).to_numpy()
+        timestamps = pd.to_datetime(seed["Timestamp"], errors="coerce", utc=True).dropna()
+        self.start = timestamps.min().value // 10**9
+        self.span = max(int(timestamps.max().value // 10**9 - self.start), 1)
+
+    @classmethod
+    def from_csv(cls, path: Path = SEED_PATH) -> TweetModel:
+        return cls(pd.read_csv(path))
+
+    def _texts(self, rng: np.random.Generator, disaster: str, n: int) -> np.ndarray:
+        lengths = rng.choice(self.lengths[disaster], size=n)
+        words = rng.choice(self.words[disaster], size=int(lengths.sum()), p=self.word_p[disaster])
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        texts = np.array([" ".join(words[bounds[i]:bounds[i + 1]]) for i in range(n)], dtype=object)
+
+        with_mention = np.flatnonzero(rng.random(n) < self.mention_rate)
+        texts[with_mention] = rng.choice(self.mentions, size=len(with_mention)) + " " + texts[with_mention]
+        with_url = np.flatnonzero(rng.random(n) < self.url_rate)
+        texts[with_url] = texts[with_url] + " " + rng.choice(self.urls, size=len(with_url))
+
+        # Duplicates copy an original (URL and all), like retweets and bot posts
+        dup = rng.random(n) < self.dup_rate[disaster]
+        originals = np.flatnonzero(~dup)
+        if len(originals):
+            texts[dup] = texts[rng.choice(originals, size=int(dup.sum()))]
+        return texts
+
+    def sample(self, rng: np.random.Generator, n: int, first_id: int = 0) -> pd.DataFrame:
+        disaster_idx = rng.choice(len(self.disasters), size=n, p=self.mix)
+        texts = np.empty(n, dtype=object)
+        for i, disaster in enumerate(self.disasters):
+            rows = np.flatnonzero(disaster_idx == i)
+            if len(rows):
+                texts[rows] = self._texts(rng, disaster, len(rows))
+
+        users = rng.integers(0, max(n // 5, 1), size=n)  # ~5 tweets per account
+        usernames = np.char.add("user", users.astype(str)).astype(object)
+        ids = np.arange(first_id, first_id + n, dtype=np.int64) + 1_700_000_000_000_000_000
+        seconds = self.start + rng.integers(0, self.span, size=n)
+        engagement = self.engagement[rng.integers(0, len(self.engagement), size=n)]
+        frame = pd.DataFrame({
+            "Name": np.char.add("User ", users.astype(str)),
+            "UserName": "@" + usernames,
+            "Timestamp": pd.to_datetime(seconds, unit="s").strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "Verified": np.where(rng.random(n) < self.verified_rate, "TRUE", "FALSE"),
+            "Tweets": texts,
+        })
+        for j, column in enumerate(ENGAGEMENT_COLUMNS):
+            frame[column] = engagement[:, j]
+        frame["Tags"] = [str(HASHTAG.findall(text)) for text in texts]
+        frame["Tweet Link"] = "https://twitter.com/" + usernames + "/status/" + ids.astype(str)
+        frame["Tweet ID"] = ids
+        frame["Disaster"] = np.array(self.disasters, dtype=object)[disaster_idx]
+        return frame[COLUMNS]
+
+
+def write_corpus(path: Path, num_tweets: int, model: TweetModel | None = None, seed: int = SEED) -> None:
+    """Write ``num_tweets`` synthetic rows to ``path`` in chunks of ``CHUNK_TWEETS``."""
+    model = model or TweetModel.from_csv()
+    rng = np.random.default_rng(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for first in range(0, num_tweets, CHUNK_TWEETS):
+        chunk = model.sample(rng, min(CHUNK_TWEETS, num_tweets - first), first_id=first)
+        chunk.to_csv(path, mode="w" if first == 0 else "a", header=first == 0, index=False,
+                     quoting=csv.QUOTE_MINIMAL)
+
+
+# Benchmark stages, each calling the process_wildfire_data stage function that
+# main() calls. Each reads and extends a shared state dict and returns how
+# many tweets it handled.
+
+def _stage_load(state):
+    state["df"] = wordcloud.load_tweets(state["path"])
+    return len(state["df"])
+
+
+def _stage_filter(state):
+    state["wildfire_df"] = wordcloud.filter_wildfire_tweets(state["df"])
+    return len(state["df"])
+
+
+def _stage_dedupe(state):
+    tweets = state["wildfire_df"]["Tweets"].tolist()
+    representatives, cluster_sizes, labels = wordcloud.collapse_tweets(tweets)
+    state.update(tweets=tweets, representatives=representatives, cluster_sizes=cluster_sizes, labels=labels)
+    return len(tweets)
+
+
+def _stage_tokenize(state):
+    state["terms"] = wordcloud.score_terms(state["tweets"], state["representatives"])
+    return len(state["representatives"])
+
+
+def _stage_sentiment(state):
+    state["sentiment"] = wordcloud.score_sentiment(state["tweets"], state["representatives"])
+    return len(state["representatives"])
+
+
+def _stage_aggregate(state):
+    word_counts, _ = wordcloud.count_terms(
+        state["representatives"], state["cluster_sizes"], state["terms"], state["sentiment"]
+    )
+    wordcloud.word_cloud_rows(word_counts)
+    trends = wordcloud.build_trends(state["wildfire_df"], state["labels"], state["terms"], state["sentiment"])
+    trends.frames()
+    return len(state["labels"])
+
+
+def _stage_process_tweets(state):
+    import scrape_wildfire_tweets as swt
+    tweets = [{"date": ts, "content": text} for ts, text in zip(state["df"]["Timestamp"], state["df"]["Tweets"])]
+    swt.process_tweets(tweets)
+    return len(tweets)
+
+
+STAGES = [
+    ("load", _stage_load),
+    ("filter", _stage_filter),
+    ("dedupe", _stage_dedupe),
+    ("tokenize", _stage_tokenize),
+    ("sentiment", _stage_sentiment),
+    ("aggregate", _stage_aggregate),
+    ("process_tweets()", _stage_process_tweets),
+]
+
+
+def _process_tweets_available() -> str | None:
+    try:
+        import scrape_wildfire_tweets as swt
+    except ImportError as e:
+        return str(e)
+    return None if swt.TextBlob is not None else "textblob is not installed"
+
+
+def _run_stages(path: Path, stages, trace: bool) -> list[tuple[str, int, float, int]]:
+    state = {"path": path}
+    results = []
+    for name, stage in stages:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        n = stage(state)
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append((name, n, elapsed, peak))
+    return results
+
+
+def benchmark(sizes: list[int]) -> None:
+    model = TweetModel.from_csv()
+    stages = STAGES
+    reason = _process_tweets_available()
+    if reason:
+        print(f"[skip] process_tweets(): {reason}")
+        stages = STAGES[:-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_tweets in sizes:
+            path = Path(tmp) / f"tweets_{num_tweets}.csv"
+            start = time.perf_counter()
+            write_corpus(path, num_tweets, model)
+            print(f"\n{num_tweets:,} tweets ({path.stat().st_size / 1e6:.1f} MB) generated in "
+                  f"{time.perf_counter() - start:.1f}s")
+            timed = _run_stages(path, stages, trace=False)
+            traced = _run_stages(path, stages, trace=True)
+            print(f"  {'stage':<22} {'input':>10} {'seconds':>9} {'tweets/s':>11} {'peak MB':>9}")
+            for (name, n, elapsed, _), (_, _, _, peak) in zip(timed, traced):
+                print(f"  {name:<22} {n:>10,} {elapsed:>9.2f} {n / max(elapsed, 1e-9):>11,.0f} {peak / 1e6:>9.1f}")
+            total = sum(elapsed for name, _, elapsed, _ in timed if name != "process_tweets()")
+            print(f"  {'process_wildfire_data':<22} {num_tweets:>10,} {total:>9.2f} {num_tweets / total:>11,.0f}")
+
+
+def main() -> None:
+    if len(sys.argv) >= 2 and sys.argv[1] == "--benchmark":
+        benchmark([int(n) for n in sys.argv[2:]] or BENCHMARK_SIZES)
+    elif len(sys.argv) == 3:
+        path = Path(sys.argv[2])
+        start = time.perf_counter()
+        write_corpus(path, int(sys.argv[1]))
+        print(f"[ok] wrote {int(sys.argv[1]):,} tweets to {path} in {time.perf_counter() - start:.1f}s")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Interned token vocabulary with array-backed word / sentiment counters.
+
+Tokens (and their bigrams / trigrams, joined with a space, e.g. "camp fire")
+are interned once to integer ids. Counts and sentiment tallies live in
+NumPy arrays indexed by id instead of per-word Counters and dicts, so each
+distinct term costs one dict slot plus a few array cells.
+
+Compare memory against the Counter / dict-of-dicts approach:
+
+    python3 scripts/vocabulary.py --benchmark [num_tokens]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+
+SENTIMENT_COLUMNS = {-1: 0, 0: 1, 1: 2}  # negative, neutral, positive
+FLUSH_EVERY = 1 << 16
+
+
+def ngrams(tokens: list[str], max_n: int = 1, is_stopword=None) -> list[str]:
+    """Unigrams followed by all 2..max_n-grams of ``tokens``.
+
+    Pass the unfiltered token sequence with an ``is_stopword`` predicate:
+    stopword unigrams and n-grams made only of stopwords are dropped, but
+    phrases still only join words that were adjacent ("out of control").
+    """
+    if is_stopword is None:
+        is_stopword = _never
+    stop = [is_stopword(token) for token in tokens]
+    terms = [token for token, s in zip(tokens, stop) if not s]
+    for n in range(2, max_n + 1):
+        terms.extend(
+            ' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1) if not all(stop[i:i + n])
+        )
+    return terms
+
+
+def _never(token: str) -> bool:
+    return False
+
+
+class Vocabulary:
+    """Bidirectional term <-> integer id mapping."""
+
+    def __init__(self):
+        self._ids = {}
+        self._terms = []
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._ids
+
+    def intern(self, term: str) -> int:
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+        return term_id
+
+    def id_of(self, term: str):
+        return self._ids.get(term)
+
+    def term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    def encode(self, terms) -> list[int]:
+        intern = self.intern
+        return [intern(t) for t in terms]
+
+
+class TermCounts:
+    """
+    Per-term frequency and (negative, neutral, positive) sentiment tallies.
+
+    Updates are buffered and folded into the arrays with ``np.bincount``, so
+    adding a tweet is a list append rather than a dict update per word.
+    """
+
+    def __init__(self, vocab: Vocabulary):
+        self.vocab = vocab
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._sentiment = np.zeros((0, 3), dtype=np.int64)
+        self._pending_ids = []
+        self._pending_cols = []
+        self._pending_weights = []
+
+    def add(self, term_ids, sentiment: int = 0, weight: int = 1) -> None:
+        col = SENTIMENT_COLUMNS.get(sentiment, 1)
+        self._pending_ids.extend(term_ids)
+        self._pending_cols.extend([col] * len(term_ids))
+        self._pending_weights.extend([weight] * len(term_ids))
+        if len(self._pending_ids) >= FLUSH_EVERY:
+            self._flush()
+
+    def add_terms(self, terms, sentiment: int = 0, weight: int = 1) -> None:
+        self.add(self.vocab.encode(terms), sentiment, weight)
+
+    def _flush(self) -> None:
+        size = len(self.vocab)
+        if len(self._counts) < size:
+            grow = max(size, 2 * len(self._counts))
+            self._counts = np.concatenate([self._counts, np.zeros(grow - len(self._counts), dtype=np.int64)])
+            self._sentiment = np.concatenate(
+                [self._sentiment, np.zeros((grow - len(self._sentiment), 3), dtype=np.int64)]
+            )
+        if not self._pending_ids:
+            return
+        ids = np.asarray(self._pending_ids, dtype=np.int64)
+        weights = np.asarray(self._pending_weights, dtype=np.int64)
+        flat = ids * 3 + np.asarray(self._pending_cols, dtype=np.int64)
+        n = len(self._counts)
+        self._counts += np.bincount(ids, weights=weights, minlength=n).astype(np.int64)
+        self._sentiment += np.bincount(flat, weights=weights, minlength=3 * n).astype(np.int64).reshape(n, 3)
+        self._pending_ids, self._pending_cols, self._pending_weights = [], [], []
+
+    @property
+    def counts(self) -> np.ndarray:
+        self._flush()
+        return self._counts[:len(self.vocab)]
+
+    @property
+    def sentiment(self) -> np.ndarray:
+        """(num_terms, 3) array of negative / neutral / positive tallies."""
+        self._flush()
+        return self._sentiment[:len(self.vocab)]
+
+    def __len__(self) -> int:
+        """Number of distinct terms with a non-zero count."""
+        return int(np.count_nonzero(self.counts))
+
+    def count(self, term: str) -> int:
+        term_id = self.vocab.id_of(term)
+        return 0 if term_id is None else int(self.counts[term_id])
+
+    def most_common(self, n: int):
+        """[(term, count), ...] ordered like ``Counter.most_common``."""
+        counts = self.counts
+        nonzero = np.flatnonzero(counts)
+        # Stable sort keeps first-seen order among ties, as Counter does
+        order = nonzero[np.argsort(-counts[nonzero], kind='stable')][:n]
+        return [(self.vocab.term(i), int(counts[i])) for i in order]
+
+    def sentiment_tallies(self, term: str) -> dict:
+        term_id = self.vocab.id_of(term)
+        neg, neu, pos = (0, 0, 0) if term_id is None else self.sentiment[term_id]
+        return {'positive': int(pos), 'neutral': int(neu), 'negative': int(neg)}
+
+    def mean_sentiment(self) -> np.ndarray:
+        """Average of the -1/0/1 sentiment scores per term."""
+        tallies = self.sentiment
+        totals = tallies.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(totals > 0, (tallies[:, 2] - tallies[:, 0]) / totals, 0.0)
+
+    @property
+    def nbytes(self) -> int:
+        return self._counts.nbytes + self._sentiment.nbytes
+
+
+def _synthetic_tokens(num_tokens: int, vocab_size: int = 50_000, seed: int = 401):
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(1.3, size=num_tokens) % vocab_size
+    words = [f"w{r}" for r in range(vocab_size)]
+    sentiments = rng.integers(-1, 2, size=num_tokens // 12 + 1)
+    tokens = [words[r] for r in ranks]
+    # Tweets of ~12 tokens each
+    return [(tokens[i:i + 12], int(sentiments[i // 12])) for i in range(0, num_tokens, 12)]
+
+
+def _measure(label: str, build, tweets, num_tokens: int, distinct: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(tweets)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_million = current / num_tokens * 1e6
+    print(f"  {label:<28} retained={current / 1e6:8.2f} MB  peak={peak / 1e6:8.2f} MB  "
+          f"{per_million / 1e6:8.2f} MB per 1M tokens  {current / distinct:6.0f} B/term  {elapsed:6.2f}s")
+    return result
+
+
+def _build_dicts(tweets):
+    word_counts = Counter()
+    word_sentiments = {}
+    for words, sentiment in tweets:
+        for word in words:
+            word_counts[word] += 1
+            if word not in word_sentiments:
+                word_sentiments[word] = {'positive': 0, 'neutral': 0, 'negative': 0}
+            key = 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral'
+            word_sentiments[word][key] += 1
+    return word_counts, word_sentiments
+
+
+def _build_arrays(tweets):
+    counts = TermCounts(Vocabulary())
+    for words, sentiment in tweets:
+        counts.add_terms(words, sentiment)
+    counts.counts  # fold the pending buffer into the arrays
+    return counts
+
+
+def benchmark(num_tokens: int = 1_000_000) -> None:
+    tweets = _synthetic_tokens(num_tokens)
+    distinct = len({w for words, _ in tweets for w in words})
+    print(f"{num_tokens:,} tokens, {distinct:,} distinct terms")
+    dicts = _measure("Counter + dict-of-dicts", _build_dicts, tweets, num_tokens, distinct)
+    arrays = _measure("Vocabulary + TermCounts", _build_arrays, tweets, num_tokens, distinct)
+    assert dicts[0].most_common(10) == arrays.most_common(10)
+
+
+def main() -> None:
+    if len(sys.argv) >= 2 and sys.argv[1] == '--benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
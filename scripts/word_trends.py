@@ -0,0 +1,160 @@
+"""
+Time-windowed word and sentiment trends for the wildfire word cloud.
+
+Tweets are bucketed by their ``Timestamp`` (per hour or per day). Each
+bucket keeps its own word counters, and a frame is emitted for every bucket
+with the top-K words over the trailing window of buckets. Adding tweets only
+invalidates the frames whose window covers the touched bucket, so earlier
+frames are served from cache instead of being recomputed.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+
+BUCKET_SIZES = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+SENTIMENT_KEYS = {1: 'positive', 0: 'neutral', -1: 'negative'}
+
+
+def floor_timestamp(ts: datetime, bucket: str) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    if bucket == 'hour':
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def dominant_sentiment(tallies: Counter) -> int:
+    """Same rule as the all-time word cloud: majority of positive vs negative."""
+    if tallies['positive'] > tallies['negative']:
+        return 1
+    if tallies['negative'] > tallies['positive']:
+        return -1
+    return 0
+
+
+class _Bucket:
+    __slots__ = ('tweets', 'counts', 'sentiments')
+
+    def __init__(self):
+        self.tweets = 0
+        self.counts = Counter()
+        self.sentiments = {}
+
+
+class WindowedWordTrends:
+    """
+    Per-bucket word counters with a cached sliding-window top-K.
+
+    ``window`` is measured in buckets, e.g. bucket='day', window=7 gives a
+    trailing 7-day word cloud for every day.
+    """
+
+    def __init__(self, bucket: str = 'day', window: int = 7, top_k: int = 50):
+        if bucket not in BUCKET_SIZES:
+            raise ValueError(f"bucket must be one of {sorted(BUCKET_SIZES)}, got {bucket!r}")
+        self.bucket = bucket
+        self.step = BUCKET_SIZES[bucket]
+        self.window = window
+        self.top_k = top_k
+        self._buckets = {}
+        self._frames = {}
+        self._dirty = set()
+
+    def add(self, timestamp: datetime, words, sentiment: int, weight: int = 1) -> None:
+        """Count one tweet's (already filtered) words into its time bucket."""
+        key = floor_timestamp(timestamp, self.bucket)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+        bucket.tweets += weight
+        label = SENTIMENT_KEYS.get(sentiment, 'neutral')
+        for word in words:
+            bucket.counts[word] += weight
+            tallies = bucket.sentiments.get(word)
+            if tallies is None:
+                tallies = bucket.sentiments[word] = Counter()
+            tallies[label] += weight
+        # Only frames whose window contains this bucket need recomputing
+        for i in range(self.window):
+            self._dirty.add(key + i * self.step)
+
+    def _frame_ends(self):
+        if not self._buckets:
+            return []
+        first, last = min(self._buckets), max(self._buckets)
+        ends = []
+        end = first
+        while end <= last:
+            ends.append(end)
+            end += self.step
+        return ends
+
+    def _build_frame(self, end: datetime, counts: Counter, sentiments: dict, tweets: int) -> dict:
+        top = heapq.nlargest(self.top_k, counts.items(), key=lambda item: (item[1], item[0]))
+        return {
+            'start': (end - (self.window - 1) * self.step).isoformat(),
+            'end': end.isoformat(),
+            'tweets': tweets,
+            'words': [
+                {'word': word, 'frequency': count, 'sentiment': dominant_sentiment(sentiments[word])}
+                for word, count in top
+            ],
+        }
+
+    def frames(self):
+        """All frames in time order, recomputing only invalidated windows."""
+        ends = self._frame_ends()
+        running_counts = None
+        running_sentiments = None
+        running_tweets = 0
+        previous = None
+        for end in ends:
+            if end in self._frames and end not in self._dirty:
+                running_counts = None
+                continue
+            if running_counts is None or previous != end - self.step:
+                # Start a fresh running window ending here
+                running_counts, running_sentiments, running_tweets = Counter(), {}, 0
+                for i in range(self.window):
+                    running_tweets += self._merge(end - i * self.step, running_counts, running_sentiments, 1)
+            else:
+                # Slide by one bucket: add the new one, drop the one leaving
+                running_tweets += self._merge(end, running_counts, running_sentiments, 1)
+                running_tweets -= self._merge(end - self.window * self.step, running_counts, running_sentiments, -1)
+            self._frames[end] = self._build_frame(end, running_counts, running_sentiments, running_tweets)
+            previous = end
+        self._dirty.clear()
+        return [self._frames[end] for end in ends]
+
+    def _merge(self, key, counts: Counter, sentiments: dict, sign: int) -> int:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0
+        for word, count in bucket.counts.items():
+            counts[word] += sign * count
+            if counts[word] <= 0:
+                del counts[word]
+            tallies = sentiments.setdefault(word, Counter())
+            for label, n in bucket.sentiments[word].items():
+                tallies[label] += sign * n
+        return bucket.tweets
+
+    def to_json(self) -> dict:
+        return {
+            'bucket': self.bucket,
+            'window': self.window,
+            'top_k': self.top_k,
+            'frames': self.frames(),
+        }
+
+    def save(self, path) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'))
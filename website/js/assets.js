@@ -0,0 +1,22 @@
+// Resolves data file paths to the content-hashed, precompressed copies listed
+// in data/dist/manifest.json (written by scripts/build_static_assets.py).
+// scripts/serve_static.py inlines the manifest into each page it serves as
+// window.ASSET_MANIFEST, so resolving a path never waits on a request. On
+// hosts without it (e.g. GitHub Pages, where data/dist is not deployed), and
+// for files not in it, the original path is used.
+const ASSET_FILES = (window.ASSET_MANIFEST && window.ASSET_MANIFEST.files) || {};
+
+function assetKey(path) {
+    return path.replace(/^(\.\.\/)+/, "");
+}
+
+function assetUrl(path) {
+    const key = assetKey(path);
+    const prefix = path.slice(0, path.length - key.length);
+    return ASSET_FILES[key] ? prefix + ASSET_FILES[key] : path;
+}
+
+async function loadCsv(path, row) {
+    const url = assetUrl(path);
+    return row ? d3.csv(url, row) : d3.csv(url);
+}
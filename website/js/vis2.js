@@ -13,6 +13,13 @@ const GLOBE_W = 640;
 const GLOBE_H = 400;
 const INITIAL_GLOBE_ROTATE = [15, -20, 0];
 const BASE_YEAR_PLAYBACK_MS = 1000;
+// Written by scripts/build_world_basemap.py and committed with the other
+// preprocessed data; the CDN copy is only a fallback if they fail to load
+const BASEMAP_LEVELS = {
+    detail: "../data/basemap/world-110m.detail.json",
+    coarse: "../data/basemap/world-110m.coarse.json"
+};
+const WORLD_ATLAS_CDN = "https://cdn.jsdelivr.net/npm/world-atlas@2/countries-110m.json";
 const MIN_YEAR_PLAYBACK_MS = 120;
 const MONTH_LABELS = [
     "All months",
@@ -23,8 +30,11 @@ const MONTH_LABELS = [
 const yearCache = new Map();
 const sampleSummaryByYear = new Map();
 const fullCountsByYear = new Map();
+const frpQuantilesByYear = new Map();
 
-let worldFeatures = [];
+let worldFeatures = { detail: [], coarse: [] };
+let globeBasemapLevel = "detail";
+let globeDragging = false;
 let currentYear = YEARS[0];
 let currentPoints = [];
 let currentYearSamplePoints = [];
@@ -138,14 +148,22 @@ function filterPointsByDate(points) {
     });
 }
 
+// Weighted samples (--frp-weighted) carry the number of detections each point
+// stands for; uniform samples count every point once.
 function buildSampleTypeCounts(points) {
     const byType = new Map();
     points.forEach(p => {
-        byType.set(p.type, (byType.get(p.type) || 0) + 1);
+        byType.set(p.type, (byType.get(p.type) || 0) + p.weight);
     });
+    byType.forEach((value, key) => byType.set(key, Math.round(value)));
     return byType;
 }
 
+function isWeightedSample(year) {
+    const weighting = sampleSummaryByYear.get(year)?.weighting;
+    return Boolean(weighting) && weighting !== "uniform";
+}
+
 async function preloadAllYearPoints() {
     if (allYearsPreloaded) return;
     await Promise.all(YEARS.map(loadYearPoints));
@@ -277,23 +295,63 @@ function disableAutoRotate() {
     toggleRotationBtn.text("Resume Globe");
 }
 
+async function loadTopologyFeatures(url) {
+    const topo = await d3.json(url);
+    return topojson.feature(topo, topo.objects.countries).features;
+}
+
 async function loadWorldFeatures() {
     try {
-        const topo = await d3.json("https://cdn.jsdelivr.net/npm/world-atlas@2/countries-110m.json");
-        worldFeatures = topojson.feature(topo, topo.objects.countries).features;
+        const [detail, coarse] = await Promise.all([
+            loadTopologyFeatures(assetUrl(BASEMAP_LEVELS.detail)),
+            loadTopologyFeatures(assetUrl(BASEMAP_LEVELS.coarse))
+        ]);
+        worldFeatures = { detail, coarse };
+        return;
+    } catch (err) {
+        console.warn("Local basemap failed to load, falling back to CDN:", err);
+    }
+    try {
+        const features = await loadTopologyFeatures(WORLD_ATLAS_CDN);
+        worldFeatures = { detail: features, coarse: features };
     } catch (err) {
         console.warn("World basemap unavailable:", err);
-        worldFeatures = [];
-        statusLine.text("Basemap failed to load from CDN. Showing points without country boundaries.");
+        worldFeatures = { detail: [], coarse: [] };
+        statusLine.text("Basemap failed to load. Showing points without country boundaries.");
+    }
+}
+
+function isGlobeMoving() {
+    return globeAutoRotate || isYearPlaying || globeDragging;
+}
+
+// The globe redraws its countries every rotation tick, so use the coarse
+// level while it moves and switch back to detail once it is at rest.
+function syncGlobeBasemapLevel() {
+    const level = isGlobeMoving() ? "coarse" : "detail";
+    if (level === globeBasemapLevel) return false;
+    globeBasemapLevel = level;
+    globeBase.selectAll(".country-shape")
+        .data(worldFeatures[level])
+        .join("path")
+        .attr("class", "country-shape");
+    return true;
+}
+
+function refreshGlobeBasemap() {
+    if (syncGlobeBasemapLevel()) {
+        globeBase.selectAll(".country-shape").attr("d", globePath);
     }
 }
 
 async function loadSampleSummary() {
     try {
-        const rows = await d3.csv("../data/preprocessed/vis2/sample_summary.csv", d => ({
+        const rows = await loadCsv("../data/preprocessed/vis2/sample_summary.csv", d => ({
             year: +d.year,
             validRows: +d.valid_rows,
-            sampleRows: +d.sample_rows
+            sampleRows: +d.sample_rows,
+            weighting: d.weighting || "uniform",
+            valueQuantiles: d.value_quantiles === "1"
         }));
         rows.forEach(d => sampleSummaryByYear.set(d.year, d));
     } catch (err) {
@@ -302,7 +360,7 @@ async function loadSampleSummary() {
 }
 
 async function loadFullCounts() {
-    const rows = await d3.csv("../data/preprocessed/wildfire_count_by_year_type.csv", d => ({
+    const rows = await loadCsv("../data/preprocessed/wildfire_count_by_year_type.csv", d => ({
         year: +(d.year ?? d.YEAR ?? ""),
         type: String(d.type ?? d.TYPE ?? ""),
         count: +(d.count ?? d.COUNT ?? 0)
@@ -317,9 +375,33 @@ async function loadFullCounts() {
     });
 }
 
+// Full-archive FRP quantiles from the t-digest sketches (build_vis2_fire_samples.py).
+// sample_summary.csv flags the years the quantiles file covers; without any,
+// the file was never built and is not requested.
+async function loadValueQuantiles() {
+    if (![...sampleSummaryByYear.values()].some(d => d.valueQuantiles)) return;
+    try {
+        const rows = await loadCsv("../data/preprocessed/vis2/fire_value_quantiles.csv", d => ({
+            year: +d.year,
+            type: String(d.type),
+            metric: d.metric,
+            p50: +d.p50,
+            p99: +d.p99
+        }));
+        rows.filter(d => d.metric === "frp").forEach(d => {
+            if (!frpQuantilesByYear.has(d.year)) {
+                frpQuantilesByYear.set(d.year, new Map());
+            }
+            frpQuantilesByYear.get(d.year).set(d.type, d);
+        });
+    } catch (err) {
+        console.warn("fire_value_quantiles.csv missing:", err);
+    }
+}
+
 async function loadYearPoints(year) {
     if (yearCache.has(year)) return yearCache.get(year);
-    const points = await d3.csv(`../data/preprocessed/vis2/fire_points_${year}.csv`, d => {
+    const points = await loadCsv(`../data/preprocessed/vis2/fire_points_${year}.csv`, d => {
         const acqDate = d.acq_date || "";
         const dateParts = parseAcqDateParts(acqDate);
         return {
@@ -331,7 +413,8 @@ async function loadYearPoints(year) {
             month: dateParts.month,
             day: dateParts.day,
             frp: +d.frp,
-            brightness: +d.brightness
+            brightness: +d.brightness,
+            weight: d.sample_weight ? +d.sample_weight : 1
         };
     });
     yearCache.set(year, points);
@@ -362,12 +445,14 @@ function updateStats(year, points) {
     if (isYearOnlyScope()) {
         statsRoot.append("p").attr("class", "stats-title").text(`Year ${year} detections by type`);
     } else {
-        statsRoot.append("p").attr("class", "stats-title").text(`Sampled detections in ${formatPeriod(year)} by type`);
+        const label = isWeightedSample(year) ? "Estimated detections (FRP-weighted sample)" : "Sampled detections";
+        statsRoot.append("p").attr("class", "stats-title").text(`${label} in ${formatPeriod(year)} by type`);
     }
 
     const byType = isYearOnlyScope() && fullCountsByYear.has(year)
         ? (fullCountsByYear.get(year) ?? new Map())
         : buildSampleTypeCounts(points);
+    const frpByType = isYearOnlyScope() ? frpQuantilesByYear.get(year) : null;
     const grid = statsRoot.append("div").attr("class", "type-stat-grid");
 
     FIRE_TYPE_META.forEach(type => {
@@ -375,6 +460,12 @@ function updateStats(year, points) {
         const item = grid.append("div").attr("class", "type-stat");
         item.append("span").attr("class", "type-name").text(type.label);
         item.append("span").attr("class", "type-value").text(formatInt(count));
+        const frp = frpByType?.get(type.key);
+        if (frp) {
+            item.append("span")
+                .attr("class", "type-detail")
+                .text(`FRP median ${frp.p50.toFixed(1)} / p99 ${frp.p99.toFixed(1)} MW`);
+        }
     });
 }
 
@@ -416,7 +507,7 @@ function buildMapBase() {
         .attr("d", mapPath(graticule));
 
     mapBase.selectAll(".country-shape")
-        .data(worldFeatures)
+        .data(worldFeatures.detail)
         .enter()
         .append("path")
         .attr("class", "country-shape")
@@ -433,8 +524,9 @@ function buildGlobeBase() {
         .attr("class", "graticule-shape")
         .attr("d", globePath(graticule));
 
+    globeBasemapLevel = isGlobeMoving() ? "coarse" : "detail";
     globeBase.selectAll(".country-shape")
-        .data(worldFeatures)
+        .data(worldFeatures[globeBasemapLevel])
         .enter()
         .append("path")
         .attr("class", "country-shape")
@@ -490,6 +582,7 @@ function isVisibleOnGlobe(point) {
 }
 
 function renderGlobe(points) {
+    syncGlobeBasemapLevel();
     globeBase.selectAll(".country-shape").attr("d", globePath);
     globeBase.selectAll(".sphere-shape").attr("d", globePath({ type: "Sphere" }));
     globeBase.selectAll(".graticule-shape").attr("d", globePath(graticule));
@@ -551,6 +644,7 @@ function stopYearPlayback() {
     yearPlaybackTimer = null;
     isYearPlaying = false;
     playYearsBtn.text("Play Timeline");
+    refreshGlobeBasemap();
 }
 
 async function advancePlaybackFrame() {
@@ -669,6 +763,7 @@ function initControls() {
     toggleRotationBtn.on("click", function () {
         globeAutoRotate = !globeAutoRotate;
         toggleRotationBtn.text(globeAutoRotate ? "Pause Globe" : "Resume Globe");
+        refreshGlobeBasemap();
     });
 
     resetGlobeBtn.on("click", function () {
@@ -685,6 +780,7 @@ function enableGlobeDrag() {
         d3.drag()
             .on("start", function (event) {
                 disableAutoRotate();
+                globeDragging = true;
                 dragStartPointer = [event.x, event.y];
                 dragStartRotate = globeProjection.rotate().slice();
             })
@@ -697,6 +793,10 @@ function enableGlobeDrag() {
                 const newLat = dragStartRotate[1] - dy * sensitivity;
                 setGlobeRotation(newLon, newLat);
             })
+            .on("end", function () {
+                globeDragging = false;
+                refreshGlobeBasemap();
+            })
     );
 }
 
@@ -715,7 +815,7 @@ async function init() {
 
     await Promise.all([
         loadWorldFeatures(),
-        loadSampleSummary(),
+        loadSampleSummary().then(loadValueQuantiles),
         loadFullCounts()
     ]);
 